@@ -0,0 +1,63 @@
+import gc
+import sys
+import tracemalloc
+
+from chatbot.classes import Record
+from chatbot.constants import GREEN, RESET
+
+# =============================================
+#   benchmark: пам'ять на один контакт
+# =============================================
+# python bench_memory.py [кількість записів ...]
+# tracemalloc рахує пам'ять записів двома способами:
+#   objects     - Record, поля, списки і дати; рядки значень створені заздалегідь
+#                 і не входять (саме цю частину змінюють __slots__)
+#   with values - те саме разом з рядками імен, номерів, адрес і e-mail,
+#                 тобто вся пам'ять, яку займає завантажений контакт
+# число "до" - той самий скрипт на версії без __slots__ (Record.from_row вже був)
+
+
+def make_rows(n: int) -> list:
+    return [
+        (
+            f"Contact{i:07d}",
+            [f"+38067{i:07d}", f"+38050{i:07d}"],
+            [f"contact{i}@example.com"] if i % 2 else [],
+            726000 + i % 20000 if i % 3 else 0,
+            f"Kyiv, Street {i % 500}" if i % 4 else None,
+        )
+        for i in range(n)
+    ]
+
+
+def load(rows) -> list:
+    return [Record.from_row(row) for row in rows]
+
+
+def traced(build, *args) -> int:
+    # байти, що лишилися зайнятими після build(); результат тримається до кінця
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = build(*args)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def bench(n: int):
+    objects = traced(load, make_rows(n))
+    # рядки створюються всередині виміру, самі rows після розбору звільняються
+    values = traced(lambda: load(make_rows(n)))
+
+    print(GREEN + f"     {n} records" + RESET)
+    for title, used in (("objects", objects), ("with values", values)):
+        print(f"\t{title:<12}: {used / 2**20:8.1f} MiB, {used / n:7.1f} bytes/contact")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000_000]
+    for size in sizes:
+        bench(size)
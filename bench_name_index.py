@@ -0,0 +1,62 @@
+import random
+import sys
+import time
+
+from chatbot.binformat import dump_contact, dump_contacts
+from chatbot.classes import AddressBook, Name
+from chatbot.constants import GREEN, RESET
+
+# =============================================
+#   benchmark: пошук контакту за ім'ям
+# =============================================
+# python bench_name_index.py [кількість записів ...]
+# індекс імен проти старого перебору всіх ключів (str(key) == str(name))
+
+LOOKUPS = 1000
+SCAN_LOOKUPS = 20
+
+
+def make_book(n: int) -> AddressBook:
+    # книга у двійковому форматі: записи розбираються лише при зверненні
+    rows = (
+        (f"Contact{i:07d}", [f"+38067{i:07d}"], [], 0, None) for i in range(n)
+    )
+    payload = dump_contacts((row[0], dump_contact(row)) for row in rows)
+    return AddressBook()._decode(payload)
+
+
+def scan(book, name):
+    name = Name(name)
+    for key in book.data:
+        if str(key) == str(name):
+            return key
+
+
+def per_lookup(func, book, names):
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    return (time.perf_counter() - start) / len(names)
+
+
+def bench(n: int):
+    book = make_book(n)
+    queries = [f"  CONTACT{random.randrange(n):07d} " for _ in range(LOOKUPS)]
+
+    start = time.perf_counter()
+    book.index("name")
+    build = time.perf_counter() - start
+
+    indexed = per_lookup(book.find_key, book, queries)
+    scanned = per_lookup(lambda q: scan(book, q), book, queries[:SCAN_LOOKUPS])
+
+    print(GREEN + f"     {n} records" + RESET)
+    print(f"\tindex build : {build:10.3f}s")
+    print(f"\tindex       : {indexed * 1e6:10.2f}µs per lookup")
+    print(f"\tfull scan   : {scanned * 1e6:10.2f}µs per lookup")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    for size in sizes:
+        bench(size)
@@ -0,0 +1,70 @@
+import gc
+import pickle
+import sys
+import time
+
+from chatbot.classes import AddressBook, Record
+from chatbot.constants import GREEN, RESET
+
+# =============================================
+#      benchmark: pickle vs двійковий формат
+# =============================================
+# python bench_storage.py [кількість записів ...]
+
+
+def make_book(n: int) -> AddressBook:
+    book = AddressBook()
+    for i in range(n):
+        row = (
+            f"Contact{i:07d}",
+            [f"+38067{i:07d}", f"+38050{i:07d}"],
+            [f"contact{i}@example.com"] if i % 2 else [],
+            726000 + i % 20000 if i % 3 else 0,
+            f"Kyiv, Street {i % 500}" if i % 4 else None,
+        )
+        record = Record.from_row(row)
+        record.book = book
+        book.data[record.name.value] = record
+    return book
+
+
+def timed(func, *args):
+    # так само, як при завантаженні книги: без збирача сміття
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return result, elapsed
+
+
+def full_load(book, payload):
+    # як pickle.loads: після відкриття розібрано кожен запис
+    loaded = book._decode(payload)
+    return [loaded.data[name] for name in loaded.data]
+
+
+def bench(n: int):
+    book = make_book(n)
+
+    pickled, pickle_dump = timed(pickle.dumps, book)
+    _, pickle_load = timed(pickle.loads, pickled)
+    del _
+
+    encoded, bin_dump = timed(book._encode)
+    # open - лише індекс імен (записи розбираються при зверненні),
+    # load - те саме плюс розбір усіх записів
+    _, bin_open = timed(book._decode, encoded)
+    _, bin_load = timed(full_load, book, encoded)
+    del _
+
+    print(GREEN + f"     {n} records" + RESET)
+    print(f"\tpickle : {len(pickled):>12} bytes  save {pickle_dump:8.3f}s  load {pickle_load:8.3f}s")
+    print(f"\tbinary : {len(encoded):>12} bytes  save {bin_dump:8.3f}s  load {bin_load:8.3f}s  open {bin_open:8.3f}s")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        bench(size)
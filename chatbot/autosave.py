@@ -0,0 +1,52 @@
+import threading
+import time
+
+from .constants import RED, RESET
+
+
+class AutoSaver(threading.Thread):
+    # фонове збереження: серія змін записується одним разом,
+    # коли після останньої зміни минуло delay секунд
+    def __init__(self, delay: float) -> None:
+        super().__init__(daemon=True)
+        self.delay = delay
+        self.lock = threading.RLock()  # тримається під час виконання команди
+        self.books = []
+        self.last_change = 0.0
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def watch(self, book, fn):
+        self.books.append((book, fn))
+
+    def touch(self):
+        self.last_change = time.monotonic()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            while not self._stopped.is_set():
+                quiet = time.monotonic() - self.last_change
+                if quiet >= self.delay:
+                    break
+                self._stopped.wait(self.delay - quiet)
+            if not self._stopped.is_set():
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            for book, fn in self.books:
+                if book.dirty:
+                    try:
+                        book.save(fn)
+                    except Exception as error:
+                        # потік не має зупинятися: зміни лишаються у пам'яті
+                        # (і в журналі) до наступної спроби
+                        print(f"{RED}{fn} was not saved: {error}{RESET}")
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self.flush()
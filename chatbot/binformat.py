@@ -0,0 +1,211 @@
+import io
+import pickle
+import struct
+
+
+# власний двійковий формат книг замість pickle об'єктів:
+#   заголовок: сигнатура, версія формату, кількість записів
+#   контакт:   RECORD + ім'я + адреса + телефони (u32) + e-mail (u16 довжина + байти)
+#   нотатка:   NOTE + заголовок + текст + теги (u16 довжина + байти)
+# версія 2 контактів: після заголовка - індекс (ім'я, зсув, довжина запису),
+# далі самі записи; так будь-який контакт читається без розбору інших
+CONTACTS_MAGIC = b"K9AB"
+NOTES_MAGIC = b"K9NB"
+NOTES_INDEX_MAGIC = b"K9NI"
+CONTACTS_VERSION = 2
+NOTES_VERSION = 1
+
+HEADER = struct.Struct("<4sHI")
+# довжини імені та адреси, день народження (ordinal), кількість телефонів та e-mail
+RECORD = struct.Struct("<HHiBB")
+NOTE = struct.Struct("<HIH")  # заголовок, текст, тегів
+STR = struct.Struct("<H")
+NOTE_INDEX_ENTRY = struct.Struct("<HH")  # номер шарда, кількість тегів
+INDEX_ENTRY = struct.Struct("<QI")  # зсув запису від початку даних, довжина
+PHONE_PREFIX = "+380"  # телефони завжди "+380" + 9 цифр, зберігаємо лише цифри
+# межі формату (u16 довжини рядків, u8 кількість телефонів та e-mail):
+# значення перевіряються ще при введенні, тож збереження на них не падає
+MAX_STR_BYTES = 2**16 - 1
+MAX_ITEMS = 2**8 - 1
+
+
+class FormatError(Exception):
+    ...
+
+
+def _check_header(payload, magic, max_version):
+    found, version, count = HEADER.unpack_from(payload, 0)
+    if found != magic:
+        raise FormatError(f"unknown file signature {found!r}")
+    if version > max_version:
+        raise FormatError(f"file format version {version} is newer than supported")
+    return version, count
+
+
+def _pack_strings(parts, strings):
+    for s in strings:
+        b = s.encode()
+        parts.append(STR.pack(len(b)))
+        parts.append(b)
+
+
+def _unpack_strings(payload, pos, count):
+    result = []
+    for _ in range(count):
+        (length,) = STR.unpack_from(payload, pos)
+        pos += STR.size
+        result.append(payload[pos : pos + length].decode())
+        pos += length
+    return result, pos
+
+
+def _pack_contact(parts, row):
+    # row: (name, phones, emails, birthday ordinal або 0, address або None)
+    name, phones, emails, birthday, address = row
+    name_b = name.encode()
+    address_b = address.encode() if address else b""
+    parts.append(
+        RECORD.pack(len(name_b), len(address_b), birthday, len(phones), len(emails))
+    )
+    parts.append(name_b)
+    parts.append(address_b)
+    parts.append(struct.pack(f"<{len(phones)}I", *(int(p[4:]) for p in phones)))
+    _pack_strings(parts, emails)
+
+
+def _unpack_contact(payload, pos):
+    name_len, address_len, birthday, phones_n, emails_n = RECORD.unpack_from(
+        payload, pos
+    )
+    pos += RECORD.size
+    name = payload[pos : pos + name_len].decode()
+    pos += name_len
+    address = payload[pos : pos + address_len].decode() or None
+    pos += address_len
+    phones = [
+        f"{PHONE_PREFIX}{p:09d}"
+        for p in struct.unpack_from(f"<{phones_n}I", payload, pos)
+    ]
+    pos += 4 * phones_n
+    emails, pos = _unpack_strings(payload, pos, emails_n)
+    return (name, phones, emails, birthday, address), pos
+
+
+def dump_contact(row) -> bytes:
+    parts = []
+    _pack_contact(parts, row)
+    return b"".join(parts)
+
+
+def load_contact(payload):
+    return _unpack_contact(payload, 0)[0]
+
+
+def dump_contacts(blobs) -> bytes:
+    # blobs: (name, закодований dump_contact запис) у потрібному порядку
+    index = []
+    data = []
+    offset = 0
+    for name, blob in blobs:
+        _pack_strings(index, [name])
+        index.append(INDEX_ENTRY.pack(offset, len(blob)))
+        data.append(blob)
+        offset += len(blob)
+    header = HEADER.pack(CONTACTS_MAGIC, CONTACTS_VERSION, len(data))
+    return b"".join([header, *index, *data])
+
+
+def contacts_index(payload):
+    # {ім'я: (початок, кінець)} запису у payload або None для версії 1
+    version, count = _check_header(payload, CONTACTS_MAGIC, CONTACTS_VERSION)
+    if version < 2:
+        return None
+    entries = []
+    pos = HEADER.size
+    for _ in range(count):
+        (length,) = STR.unpack_from(payload, pos)
+        pos += STR.size
+        name = payload[pos : pos + length].decode()
+        pos += length
+        entries.append((name, *INDEX_ENTRY.unpack_from(payload, pos)))
+        pos += INDEX_ENTRY.size
+    # pos - початок даних
+    return {name: (pos + start, pos + start + size) for name, start, size in entries}
+
+
+def load_contacts(payload):
+    index = contacts_index(payload)
+    if index is not None:
+        for start, end in index.values():
+            yield _unpack_contact(payload, start)[0]
+        return
+    _, count = _check_header(payload, CONTACTS_MAGIC, CONTACTS_VERSION)
+    pos = HEADER.size
+    for _ in range(count):
+        row, pos = _unpack_contact(payload, pos)
+        yield row
+
+
+def dump_notes(rows) -> bytes:
+    # rows: (title, content, tags)
+    parts = []
+    count = 0
+    for title, content, tags in rows:
+        title_b = title.encode()
+        content_b = content.encode()
+        parts.append(NOTE.pack(len(title_b), len(content_b), len(tags)))
+        parts.append(title_b)
+        parts.append(content_b)
+        _pack_strings(parts, tags)
+        count += 1
+    return HEADER.pack(NOTES_MAGIC, NOTES_VERSION, count) + b"".join(parts)
+
+
+def load_notes(payload):
+    _, count = _check_header(payload, NOTES_MAGIC, NOTES_VERSION)
+    pos = HEADER.size
+    for _ in range(count):
+        title_len, content_len, tags_n = NOTE.unpack_from(payload, pos)
+        pos += NOTE.size
+        title = payload[pos : pos + title_len].decode()
+        pos += title_len
+        content = payload[pos : pos + content_len].decode()
+        pos += content_len
+        tags, pos = _unpack_strings(payload, pos, tags_n)
+        yield title, content, tags
+
+
+def dump_notes_index(rows) -> bytes:
+    # rows: (title, shard, tags)
+    parts = []
+    count = 0
+    for title, shard, tags in rows:
+        _pack_strings(parts, [title])
+        parts.append(NOTE_INDEX_ENTRY.pack(shard, len(tags)))
+        _pack_strings(parts, tags)
+        count += 1
+    return HEADER.pack(NOTES_INDEX_MAGIC, NOTES_VERSION, count) + b"".join(parts)
+
+
+def load_notes_index(payload):
+    _, count = _check_header(payload, NOTES_INDEX_MAGIC, NOTES_VERSION)
+    pos = HEADER.size
+    for _ in range(count):
+        (title,), pos = _unpack_strings(payload, pos, 1)
+        shard, tags_n = NOTE_INDEX_ENTRY.unpack_from(payload, pos)
+        pos += NOTE_INDEX_ENTRY.size
+        tags, pos = _unpack_strings(payload, pos, tags_n)
+        yield title, shard, tags
+
+
+class LegacyUnpickler(pickle.Unpickler):
+    # старі файли писалися з модулів верхнього рівня (classes, notes),
+    # а не з пакета chatbot - перенаправляємо класи у пакет
+    def find_class(self, module, name):
+        if module in ("classes", "notes", "constants"):
+            module = f"{__package__}.{module}"
+        return super().find_class(module, name)
+
+
+def loads_legacy(payload):
+    return LegacyUnpickler(io.BytesIO(payload)).load()
@@ -0,0 +1,29 @@
+from collections import OrderedDict
+
+
+class ResultCache:
+    # LRU-кеш результатів команд; ключ містить покоління книги (version),
+    # тож після будь-якої зміни старі результати просто більше не знаходяться
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        result = compute()
+        self.entries[key] = result
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -1,9 +1,43 @@
 from collections import UserDict
 from .constants import RED, GRAY, CYAN, MAGENTA, RESET, LEN_OF_NAME_FIELD
-from datetime import datetime
+from .constants import RECORD_CACHE_SIZE
+from .journal import Journaled
+from .paging import Paged
+from .storage import SQLiteStore, LazyRecordStore, SortedDict
+from .indexes import (
+    NameIndex,
+    PhoneIndex,
+    TrigramIndex,
+    BirthdayIndex,
+    FuzzyIndex,
+    EmailIndex,
+    PhoneticIndex,
+    NGRAM,
+    birthday_windows,
+    canonical_name,
+    edit_distance,
+    latin_name,
+    next_birthday,
+)
+from .binformat import (
+    CONTACTS_MAGIC,
+    MAX_ITEMS,
+    MAX_STR_BYTES,
+    contacts_index,
+    dump_contact,
+    dump_contacts,
+    load_contacts,
+    loads_legacy,
+)
+from .validators import (
+    extract_emails,
+    normalize_email,
+    normalize_emails,
+    normalize_phone,
+    normalize_phones,
+)
+from datetime import date, datetime
 import os.path
-import pickle
-import re
 
 
 class PhoneError(Exception):
@@ -22,18 +56,40 @@ class NoContactError(Exception):
     ...
 
 
+class FieldError(Exception):
+    ...
+
+
 class Field:
+    # поля без __dict__: значення - єдиний слот _value;
+    # підкласи оголошують __slots__ = (), інакше знову отримають __dict__
+    __slots__ = ("_value",)
+    _legacy_attr = "_Field__value"  # де значення лежало у __dict__ старих файлів
+    max_bytes = MAX_STR_BYTES  # довжина рядка у файлі - u16
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "value" in vars(cls):
+            cls._legacy_attr = f"_{cls.__name__}__value"
+
     def __init__(self, value) -> None:
-        self.__value = None
         self.value = value
 
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, new_value):
-        self.__value = new_value
+        if (
+            self.max_bytes is not None
+            and isinstance(new_value, str)
+            and len(new_value.encode()) > self.max_bytes
+        ):
+            raise FieldError(
+                f"{RED}{type(self).__name__.lower()} is too long (more than {self.max_bytes} bytes){RESET}"
+            )
+        self._value = new_value
 
     def __str__(self) -> str:
         return str(self.value)
@@ -41,83 +97,135 @@ class Field:
     def __repr__(self) -> str:
         return str(self)
 
+    @classmethod
+    def restore(cls, value):
+        # без повторної перевірки: значення перевірене ще до збереження у файл
+        field = cls.__new__(cls)
+        field._value = value
+        return field
+
+    def __getstate__(self):
+        return {"_value": self._value}
+
+    def __setstate__(self, state):
+        # старі pickle-файли зберігали __dict__ з name mangling
+        if "_value" not in state:
+            state = {"_value": state.get(self._legacy_attr)}
+        self._value = state["_value"]
+
 
 class Name(Field):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         super().__init__(str(value).title())
 
 
 class Phone(Field):
+    __slots__ = ()
+
     def __eq__(self, __value: object) -> bool:
         return self.value == __value.value
 
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, phone: str):
-        new_phone = str(phone).strip()
-        for char in "+( )-.":
-            new_phone = new_phone.replace(char, "")
-        if len(new_phone) >= 9 and new_phone.isdigit():
-            new_phone = "+380" + new_phone[-9:]
-        else:
-            raise PhoneError(f"{RED}{phone} - incorrect phone number{RESET}")
-        self.__value = new_phone
+        new_phone = normalize_phone(phone)
+        if new_phone is None:
+            raise self.error(phone)
+        self._value = new_phone
+
+    @staticmethod
+    def error(phone):
+        return PhoneError(f"{RED}{phone} - incorrect phone number{RESET}")
+
+    @classmethod
+    def normalize_many(cls, phones):
+        # масова перевірка (імпорт) без винятку на кожен номер:
+        # ([нормалізовані номери], [(номер, PhoneError)]) у порядку phones
+        valid = []
+        errors = []
+        for phone, value in normalize_phones(phones):
+            if value is None:
+                errors.append((phone, cls.error(phone)))
+            else:
+                valid.append(value)
+        return valid, errors
 
 
 class Email(Field):
+    __slots__ = ()
+
     def __eq__(self, __value: object) -> bool:
         return self.value == __value.value
 
+    @staticmethod
     def find_all_emails(text):
-        result = re.findall(r"[A-z.]+\w+@[A-z]+\.[A-z]{2,}", text)
-        return result
+        # text - рядок або ітератор рядків (файл); великі тексти - extract_emails
+        return list(extract_emails(text))
+
+    @staticmethod
+    def error(email):
+        return EmailError(
+            f"{RED}{email} - invalid email, the email must contains only letters, digits, @ and .{RESET}"
+        )
+
+    @classmethod
+    def validate_many(cls, emails):
+        # як Phone.normalize_many: ([адреси], [(адреса, EmailError)])
+        valid = []
+        errors = []
+        for email, value in normalize_emails(emails):
+            if value is None:
+                errors.append((email, cls.error(str(email).strip())))
+            else:
+                valid.append(value)
+        return valid, errors
 
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, email: str):
-        new_email = str(email).strip()
-        # extend vemail check
-        # if "@" in new_email and "." in new_email:
-        if re.findall(r"[A-z.]+\w+@[A-z]+\.[A-z]{2,}", new_email):
-            self.__value = new_email
-        else:
-            raise EmailError(
-                f"{RED}{new_email} - invalid email, the email must contains only letters, digits, @ and .{RESET}"
-            )
-        # self.__value = new_email
+        new_email = normalize_email(email)
+        if new_email is None:
+            raise self.error(str(email).strip())
+        self._value = new_email
 
     def __str__(self) -> str:
         return f"{self.value}" if self.value else ""
 
 
 class BirthDay(Field):
+    __slots__ = ()
+
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, value):
         if isinstance(value, datetime):
-            self.__value = value
+            self._value = value
         else:
             try:
-                self.__value = datetime.strptime(str(value), "%Y-%m-%d").date()
+                self._value = datetime.strptime(str(value), "%Y-%m-%d").date()
             except ValueError:
-                self.__value = datetime.strptime(str(value), "%d-%m-%Y").date()
+                self._value = datetime.strptime(str(value), "%d-%m-%Y").date()
             else:
-                raise BDayError(f"{RED}{self.__value} - incorrect date{RESET}")
+                raise BDayError(f"{RED}{self._value} - incorrect date{RESET}")
 
     def __str__(self) -> str:
         return str(self.value)
 
 
 class Address(Field):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         super().__init__(str(value).title())
 
@@ -126,6 +234,20 @@ class Address(Field):
 
 
 class Record:
+    # без __dict__: мільйон контактів - це мільйон записів у пам'яті
+    __slots__ = (
+        "name",
+        "phones",
+        "emails",
+        "birthday",
+        "address",
+        "book",
+        "version",  # лічильник змін запису - ключ кешу рядка
+        "_birthday_cache",  # (день, наступний день народження, днів до нього, вік)
+        "_str_cache",  # ((версія, день), рядок запису)
+    )
+    _state = ("name", "phones", "emails", "birthday", "address")  # що зберігається
+
     def __init__(
         self,
         name: Name,
@@ -134,6 +256,9 @@ class Record:
         email: Email | None = None,
         address: Address | None = None,
     ) -> None:
+        self.book = None  # книга, якій належить запис (для журналу змін)
+        self.version = 0
+        self._clear_cache()
         self.name = Name(name)
         self.phones = [Phone(phone)] if phone else []
         self.emails = [Email(email)] if email else []
@@ -142,26 +267,36 @@ class Record:
 
     def add_birthday(self, birthday: BirthDay):
         self.birthday = BirthDay(birthday)
+        self._birthday_cache = None
+        self._changed("add_birthday", self.datetime_to_str(self.birthday))
         return f"the date of birth for contact {self.name} is set to {self.datetime_to_str(self.birthday)} \n\t{self}"
 
     def add_address(self, address: Address):
         self.address = Address(address)
+        self._changed("add_address", self.address.value)
         return (
             f"the address for contact {self.name} is set to {self.address} \n\t{self}"
         )
 
     def add_phone(self, phone: Phone) -> str:
-        phone = Phone(phone)
+        if not isinstance(phone, Phone):
+            phone = Phone(phone)
         if phone in self.phones:
             return f"{RED}number {phone} is already present in {self.name}'s contact list {RESET} \n\t{self}"
+        if len(self.phones) >= MAX_ITEMS:
+            return f"{RED}contact {self.name} already has {MAX_ITEMS} phone numbers{RESET} \n\t{self}"
         self.phones.append(phone)
+        self._changed("add_phone", phone.value)
         return f"phone number {phone} has been added to {self.name}'s contact list  \n\t{self}"
 
     def add_email(self, email: Email) -> str:
         email = Email(email)
         if email in self.emails:
             return f"{RED}email {email} is already present in {self.name}'s contact list {RESET} \n\t{self}"
+        if len(self.emails) >= MAX_ITEMS:
+            return f"{RED}contact {self.name} already has {MAX_ITEMS} e-mails{RESET} \n\t{self}"
         self.emails.append(email)
+        self._changed("add_email", email.value)
         return f"email {email} has been added to {self.name}'s contact list  \n\t{self}"
 
     def datetime_to_str(self, date):
@@ -172,22 +307,32 @@ class Record:
             else date_to_str[8:] + "-" + date_to_str[5:7] + "-" + date_to_str[:4]
         )
 
+    def birthday_info(self, today: date | None = None):
+        # (наступний день народження, днів до нього, вік) або None;
+        # рахується раз на день, add_birthday скидає кеш
+        if self.birthday is None:
+            return None
+        today = today or date.today()
+        cache = self._birthday_cache
+        if cache is None or cache[0] != today:
+            born = self.birthday.value
+            bd_next = next_birthday(born, today)
+            days_until = (bd_next - today).days
+            cache = (today, bd_next, days_until, bd_next.year - born.year)
+            self._birthday_cache = cache
+        return cache[1:]
+
     def days_to_birthday(self, birthday: BirthDay):
+        if birthday is self.birthday:
+            return self.birthday_info()[1:]
         today_date = datetime.today().date()
         try:
             birth_date = datetime.strptime(str(birthday), "%Y-%m-%d").date()
         except ValueError:
             birth_date = datetime.strptime(str(birthday), "%d-%m-%Y").date()
-        bd_next = datetime(
-            day=birth_date.day, month=birth_date.month, year=today_date.year
-        )
-        age = today_date.year - birth_date.year
-        if today_date > bd_next.date():
-            bd_next = datetime(
-                day=birth_date.day, month=birth_date.month, year=today_date.year + 1
-            )
-            age += 1
-        days_until = (bd_next.date() - today_date).days
+        bd_next = next_birthday(birth_date, today_date)
+        age = bd_next.year - birth_date.year
+        days_until = (bd_next - today_date).days
         return days_until, age
 
     def edit_phone(self, old_phone: Phone, new_phone: Phone) -> str:
@@ -197,16 +342,28 @@ class Record:
             return f"{RED}you are trying to replace the phone number {old_phone} with the same one {new_phone}{RESET} \n\t{self}"
         if old_phone in self.phones:
             self.phones[self.phones.index(old_phone)] = new_phone
+            self._changed("edit_phone", old_phone.value, new_phone.value)
             return f"phone number {old_phone} has been successfully changed to {new_phone} for contact {self.name} \n\t{self}"
         return f"{RED}phone number {old_phone} is not among the contact numbers of {self.name}{RESET} \n\t{self}"
 
+    def _stored_email(self, email) -> Email | None:
+        # збережена адреса шукається без повторної перевірки: адреси, прийняті
+        # попередніми правилами, теж можна змінити чи видалити
+        value = email.value if isinstance(email, Email) else str(email).strip()
+        for em in self.emails:
+            if em.value == value:
+                return em
+        return None
+
     def edit_email(self, old_email: Email, new_email: Email) -> str:
-        old_email = Email(old_email)
         new_email = Email(new_email)
-        if old_email == new_email:
+        stored = self._stored_email(old_email)
+        if stored is not None and stored == new_email:
             return f"{RED}you are trying to replace the email {old_email} with the same one {new_email}{RESET} \n\t{self}"
-        if old_email in self.emails:
-            self.emails[self.emails.index(old_email)] = new_email
+        if stored is not None:
+            old_email = stored
+            self.emails[self.emails.index(stored)] = new_email
+            self._changed("edit_email", old_email.value, new_email.value)
             return f"email {old_email} has been successfully changed to {new_email} for contact {self.name} \n\t{self}"
         return f"{RED}email {old_email} is not among the contact e-mails of {self.name}{RESET} \n\t{self}"
 
@@ -218,10 +375,9 @@ class Record:
         return f"{RED}phone number {phone} not found {RESET}"
 
     def find_email(self, email: Email):
-        email = Email(email)
-        for em in self.emails:
-            if em == email:
-                return f"email {email} found among {self.name}'s contact numbers"
+        stored = self._stored_email(email)
+        if stored is not None:
+            return f"email {stored} found among {self.name}'s contact numbers"
         return f"{RED}email {email} not found {RESET}"
 
     def remove_phone(self, phone: Phone):
@@ -229,38 +385,74 @@ class Record:
         if phone not in self.phones:
             return f"{RED}phone number {phone} is not among the contact numbers of {self.name} {RESET}\n\t{self}"
         self.phones.remove(phone)
+        self._changed("remove_phone", phone.value)
         return f"phone number {phone} has been removed from {self.name}'s contact list \n\t{self}"
 
     def remove_email(self, email: Email):
-        email = Email(email)
-        if email not in self.emails:
+        stored = self._stored_email(email)
+        if stored is None:
             return f"{RED}email {email} is not among the contact numbers of {self.name} {RESET}\n\t{self}"
+        email = stored
         self.emails.remove(email)
+        self._changed("remove_email", email.value)
         return (
             f"email {email} has been removed from {self.name}'s contact list \n\t{self}"
         )
 
     def remove_address(self):
         self.address = None
+        self._changed("remove_address")
         return f"address of {self.name} has been removed \n\t{self}"
 
+    def to_row(self):
+        return (
+            self.name.value,
+            [p.value for p in self.phones],
+            [e.value for e in self.emails],
+            self.birthday.value.toordinal() if self.birthday else 0,
+            self.address.value if self.address else None,
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        name, phones, emails, birthday, address = row
+        record = cls.__new__(cls)
+        record.book = None
+        record.version = 0
+        record._clear_cache()
+        record.name = Name.restore(name)
+        record.phones = [Phone.restore(p) for p in phones]
+        record.emails = [Email.restore(e) for e in emails]
+        if birthday:
+            record.birthday = BirthDay.restore(date.fromordinal(birthday))
+        else:
+            record.birthday = None
+        record.address = Address.restore(address) if address else None
+        return record
+
+    def _clear_cache(self):
+        self._birthday_cache = None
+        self._str_cache = None
+
+    def _changed(self, method, *args):
+        self.version += 1
+        if self.book is not None:
+            self.book.record_changed(self, method, *args)
+
     def seek_phone(self, phone: Phone):
-        for p in self.phones:
-            ph = p.value[:]
-            if str(phone) in str(ph):
-                return True
-            else:
-                return False
+        return any(str(phone) in p.value for p in self.phones)
 
     def seek_email(self, email: Email):
-        for e in self.emails:
-            em = e.value[:]
-            if str(email) in str(em):
-                return True
-            else:
-                return False
+        return any(str(email) in e.value for e in self.emails)
 
     def __str__(self) -> str:
+        # рядок будується раз на версію запису і день (змінюються дні до дня народження)
+        key = (self.version, date.today())
+        if self._str_cache is None or self._str_cache[0] != key:
+            self._str_cache = (key, self._render())
+        return self._str_cache[1]
+
+    def _render(self) -> str:
         blanks = " " * (LEN_OF_NAME_FIELD - len(str(self.name)))
         name_str = f"{self.name} {blanks}: "
         phone_str = f"{', '.join(str(p) for p in self.phones)}"
@@ -268,15 +460,12 @@ class Record:
             phone_str += "  "
 
         if self.birthday:
-            days_to_bd = int(self.days_to_birthday(self.birthday)[0])
+            _, days_to_bd, years_bd = self.birthday_info()
             data_bd_str = self.datetime_to_str(self.birthday)
-            years_bd = self.days_to_birthday(self.birthday)[1]
             if days_to_bd == 0:
                 bd_str = f"{MAGENTA}birthday: {RESET}{data_bd_str} {MAGENTA}(today is {years_bd}th birthday){RESET}"
             else:
-                color_bd = (
-                    CYAN if (self.days_to_birthday(self.birthday)[0] <= 7) else GRAY
-                )
+                color_bd = CYAN if days_to_bd <= 7 else GRAY
                 bd_str = f"{color_bd}birthday: {RESET}{data_bd_str} {color_bd}({days_to_bd} days until the {years_bd}th birthday){RESET}"
         else:
             bd_str = ""
@@ -301,17 +490,174 @@ class Record:
     def __repr__(self) -> str:
         return str(self)
 
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self._state}
+
+    def __setstate__(self, state):
+        # і старий __dict__ (у ньому міг не бути address), і новий стан
+        self.book = None
+        self.version = 0
+        self._clear_cache()
+        self.address = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+
+class AddressBook(Paged, Journaled, UserDict):
+    index_types = {
+        "name": NameIndex,
+        "phone": PhoneIndex,
+        "trigram": TrigramIndex,
+        "birthday": BirthdayIndex,
+        "fuzzy": FuzzyIndex,
+        "email": EmailIndex,
+        "phonetic": PhoneticIndex,
+    }
+
+    def __init__(self, *args, **kwargs):
+        self.indexes = {}  # побудовані індекси, див. index()
+        super().__init__(*args, **kwargs)
+        self.data = SortedDict(self.data)  # завжди у порядку імен
+
+    def index(self, kind):
+        # індекс будується при першому зверненні, далі лише оновлюється
+        if kind not in self.indexes:
+            self.indexes[kind] = self.index_types[kind]().build(self)
+        return self.indexes[kind]
+
+    def _index_add(self, record: Record):
+        for index in self.indexes.values():
+            index.add(record)
+
+    def _index_discard(self, name):
+        for index in self.indexes.values():
+            index.discard(name)
+
+    def find_key(self, name, latin=False):
+        # ключ запису без урахування регістру та зайвих пробілів або None;
+        # latin - те саме ім'я іншою абеткою ("olena" -> "Олена"), лише для
+        # пошуку: команди, що змінюють дані, працюють тільки з точним ім'ям
+        key = Name(name).value
+        if key in self.data:
+            return key
+        names = self.index("name").lookup(canonical_name(name))
+        if not names and latin:
+            names = self.index("phonetic").latin(name)
+        return min(names) if names else None
+
+    def find_record(self, name, latin=False) -> Record | None:
+        key = self.find_key(name, latin)
+        return self.data[key] if key is not None else None
+
+    def find_by_phone(self, phone: Phone) -> list:
+        # хто дзвонить: записи, серед номерів яких є phone
+        phone = Phone(phone).value
+        if hasattr(self.data, "names_by_phone"):
+            names = self.data.names_by_phone(phone)
+        else:
+            names = sorted(self.index("phone").lookup(phone))
+        return [self.data[name] for name in names]
+
+    # пошук імен: SQLiteStore відповідає запитом по своїх індексах,
+    # інакше - індекси в пам'яті (для SQLite вони розбирали б кожен запис)
+    def names_by_email_domain(self, domain: str) -> list:
+        if hasattr(self.data, "names_by_email_domain"):
+            return self.data.names_by_email_domain(domain)
+        return self.index("email").domain(domain)
+
+    def names_by_email_prefix(self, prefix: str) -> list:
+        if hasattr(self.data, "names_by_email_prefix"):
+            return self.data.names_by_email_prefix(prefix)
+        return self.index("email").prefix(prefix)
+
+    def names_by_birthday_days(self, low: int, high: int) -> list:
+        # low і high - дні року mmdd; імена за датою
+        if hasattr(self.data, "names_by_birthday_days"):
+            return self.data.names_by_birthday_days(low, high)
+        return self.index("birthday").range(low, high)
+
+    def names_by_text(self, text: str) -> set | None:
+        # кандидати для search (text у нижньому регістрі) або None - перебір
+        if len(text) < NGRAM:
+            return None
+        if hasattr(self.data, "names_by_text"):
+            names = self.data.names_by_text(text)
+            if names is not None:
+                return names
+        return self.index("trigram").candidates(text)
+
+    def find_by_email_domain(self, domain: str) -> list:
+        # усі контакти з адресою у домені (і його піддоменах)
+        return [self.data[name] for name in self.names_by_email_domain(domain)]
+
+    def find_by_email_prefix(self, prefix: str) -> list:
+        return [self.data[name] for name in self.names_by_email_prefix(prefix)]
+
+    def search(self, text: str):
+        # записи, які можуть містити text; збіг перевіряє викликач
+        names = self.names_by_text(text)
+        names = list(self.data) if names is None else sorted(names)
+        for name in names:
+            yield self.data[name]
+
+    def upcoming_names(self, days: int, today: date) -> list:
+        # імена з днем народження від today до today + days, за датою
+        names = []
+        for low, high in birthday_windows(today, days):
+            names.extend(self.names_by_birthday_days(low, high))
+        return names
+
+    def birthdays_within(self, days: int, today: date | None = None) -> list:
+        names = self.upcoming_names(days, today or date.today())
+        return [self.data[name] for name in names]
+
+    def fuzzy(self, name, limit=3) -> list:
+        # [(відстань, Record)] контактів з найближчими до name іменами:
+        # з BK-дерева і схожі за звучанням, разом за відстанню транслітерацій
+        found = {key: d for d, key in self.index("fuzzy").closest(name, limit)}
+        word = latin_name(name)
+        for key in self.index("phonetic").sounds_like(name):
+            if key not in found:
+                found[key] = edit_distance(word, latin_name(key))
+        ranked = sorted((distance, key) for key, distance in found.items())
+        return [(distance, self.data[key]) for distance, key in ranked[:limit]]
+
+    def sounds_like(self, name) -> list:
+        # контакти, чиї імена звучать як name (будь-якою абеткою)
+        return [self.data[key] for key in self.index("phonetic").sounds_like(name)]
+
+    def did_you_mean(self, name, limit=3) -> str:
+        similar = ", ".join(record.name.value for _, record in self.fuzzy(name, limit))
+        return f"\n\t{GRAY}did you mean: {similar}?{RESET}" if similar else ""
+
+    def between(self, first: str, last: str):
+        # контакти з іменами від first до last ("b", "d" -> Billy ... Dora)
+        return super().between(Name(first).value, Name(last).value)
 
-class AddressBook(UserDict):
     def add_record(self, record: Record):
         self.data[record.name.value] = record
+        record.book = self
+        self._index_add(record)
+        self._log("book", "add_record", (record,))
         return f"contact {record.name} has been successfully added \n\t{record}"
 
+    def add_records(self, records: list):
+        # масове додавання (імпорт): одна операція в журналі на всю пачку
+        if hasattr(self.data, "update_many"):
+            self.data.update_many(records)
+        else:
+            # одне злиття відсортованих ключів на всю пачку
+            self.data.update({record.name.value: record for record in records})
+        for record in records:
+            record.book = self
+            self._index_add(record)
+        self._log("book", "add_records", (records,))
+        return f"{len(records)} contacts have been successfully added"
+
     def change_name(self, name: Name, new_name: Name):
-        name = Name(name)
-        for key in self.data:
-            if str(key) == str(name):
-                rec: Record = self.get(key)
+        rec: Record = self.find_record(name)
+        if rec is None:
+            return f"{RED}contact {Name(name)} not found{RESET}"
         new_record = Record(
             Name(new_name),
             birthday=rec.datetime_to_str(rec.birthday) if rec.birthday else None,
@@ -324,47 +670,117 @@ class AddressBook(UserDict):
         #     new_record.add_email(email) #
 
 
-        self.add_record(new_record)
+        # спочатку видалення: нове ім'я може відрізнятися лише регістром
         self.delete_record(name)
+        self.add_record(new_record)
         return f"the name of the contact {Name(name)} has been changed to {Name(new_name)} \n\t{new_record}"
 
     def delete_record(self, name: Name):
-        # if name in self.data:
-        #     del self.data[name]
-        name = Name(name)
-        for key, item in self.data.items():
-            if str(key) == str(name):
-                del self.data[key]
-                return f"contact {name} has been successfully deleted"
-        return f"{RED}contact {name} not found{RESET}"
+        key = self.find_key(name)
+        if key is None:
+            return f"{RED}contact {Name(name)} not found{RESET}"
+        del self.data[key]
+        self._index_discard(key)
+        self._log("book", "delete_record", (key,))
+        return f"contact {key} has been successfully deleted"
 
     def find_name(self, name: Name):
-        # self.data.get(name, None)
-        name = Name(name)
-        for key, item in self.data.items():
-            if str(key) == str(name):
-                return f"contact {name} found \n\t{item}"
-        return f"{RED}contact {name} not found{RESET}"
-
-    def iterator(self, n=None):
-        counter = 0
-        while counter < len(self):
-            yield list(self.values())[counter : counter + n]
-            counter += n
+        record = self.find_record(name, latin=True)
+        if record is None:
+            return f"{RED}contact {Name(name)} not found{RESET}{self.did_you_mean(name)}"
+        return f"contact {record.name} found \n\t{record}"
 
     def read_contacts_from_file(self, fn):
-        if os.path.exists(fn):
-            with open(fn, "rb") as fh:
-                self = pickle.load(fh)
-            self.data = dict(sorted(self.items()))
+        loaded = self._load_snapshot(fn)
+        if loaded is not None:
+            self = loaded
         print(f"{GRAY}the contact book has been successfully restored{RESET}")
         return self
 
     def write_contacts_to_file(self, fn):
-        with open(fn, "wb") as fh:
-            pickle.dump(self, fh)
+        if hasattr(self.data, "save"):
+            # зовнішнє сховище (SQLite) зберігає себе само
+            self.data.save()
+        else:
+            payload = self._save_snapshot(fn)
+            if hasattr(self.data, "rebase"):
+                # змінені записи тепер є у файлі - більше не тримаємо їх у пам'яті
+                self.data.rebase(payload, contacts_index(payload))
         return f"{GRAY}the contact book has been saved successfully{RESET}"
 
+    @classmethod
+    def open_sqlite(cls, fn, legacy_fn=None):
+        book = cls()
+        book.data = SQLiteStore(fn, Record)
+        book.data.book = book
+        if legacy_fn and not len(book.data) and os.path.exists(legacy_fn):
+            # перший запуск: переносимо контакти зі старого файлу
+            old_book = cls().read_contacts_from_file(legacy_fn)
+            book.data.update_many(old_book.data.values())
+        return book
+
+    def record_changed(self, record: Record, method, *args):
+        if hasattr(self.data, "record_changed"):
+            self.data.record_changed(record)
+        self._index_add(record)
+        self._log("record", record.name.value, method, args)
+
+    def _snapshot(self, fn):
+        return self.write_contacts_to_file(fn)
+
+    def _adopt(self, other):
+        self.data = other.data
+        self.indexes = {}
+        if isinstance(self.data, SortedDict):
+            for record in self.data.values():
+                record.book = self
+        else:
+            self.data.book = self
+
+    def _encode(self):
+        raw = getattr(self.data, "raw", None)
+
+        def blobs():
+            for name in self.data:  # сховища ітеруються у порядку імен
+                # незмінені записи копіюються з файлу як є, без розбору
+                blob = raw(name) if raw else None
+                if blob is None:
+                    blob = dump_contact(self.data[name].to_row())
+                yield name, blob
+
+        return dump_contacts(blobs())
+
+    def _decode(self, payload):
+        if not payload.startswith(CONTACTS_MAGIC):
+            # старий pickle-файл - при наступному збереженні стане новим форматом
+            book = loads_legacy(payload)
+            book.data = SortedDict(book.data)
+            return book
+        book = type(self)()
+        index = contacts_index(payload)
+        if index is not None:
+            book.data = LazyRecordStore(payload, index, Record, RECORD_CACHE_SIZE)
+            book.data.book = book
+            return book
+        records = {}
+        for row in load_contacts(payload):
+            record = Record.from_row(row)
+            record.book = book
+            records[record.name.value] = record
+        book.data = SortedDict(records)
+        return book
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("indexes", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.indexes = {}
+        for record in self.data.values():
+            record.book = self
+
     def __getitem__(self, key: str) -> Record:
         return self.data[key]
 
@@ -1,6 +1,18 @@
 TITLE = f"\t\t\tPersonal Assistant\t\033[33mteam K-9 project"
 FILENAME = "addressbook.bin"
 NOTE_FILENAME = "notes.bin"
+NOTES_DIR = "notes.d"  # каталог з шардами нотаток
+NOTE_SHARDS = 64
+STORAGE_BACKEND = "pickle"  # "pickle" або "sqlite"
+SQLITE_FILENAME = "addressbook.db"
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_LIMIT = 1000  # після скількох записів журнал згортається у знімок
+SNAPSHOT_KEEP = 3  # скільки останніх знімків зберігати (addressbook.bin, .1, .2)
+RECORD_CACHE_SIZE = 10_000  # скільки розібраних контактів тримати в пам'яті
+IMPORT_BATCH = 1000  # контактів в одній пачці при імпорті
+IMPORT_ERRORS_SHOWN = 10  # скільки повідомлень про помилки імпорту показувати
+AUTOSAVE_DELAY = 1.0  # секунд без змін перед фоновим збереженням
+RESULT_CACHE_SIZE = 256  # скільки результатів пошукових команд пам'ятати
 
 BLACK = "\033[30m"
 RED = "\033[31m"
@@ -48,16 +60,23 @@ HELP_LIST = [
     f"\t{YELLOW}birthdays {CYAN}<days>                         {RESET} - a list of contacts who have a birthday within {GRAY}<days>{RESET} days",
     f"\t{YELLOW}list {GRAY}<pages>                             {RESET} - show all contacts, {GRAY}<pages>(optional) - lines per page{RESET}",
     f"\t{YELLOW}list_notes {GRAY}<pages>                       {RESET} - show all notes, {GRAY}<pages>(optional) - lines per page{RESET}",
+    f"\t{YELLOW}import {CYAN}<file>                            {RESET} - import contacts from a .csv or .vcf file",
+    f"\t{YELLOW}export {CYAN}<file>                            {RESET} - export all contacts to a .csv or .vcf file",
+    f"\t{YELLOW}who {CYAN}<phone>                             {RESET} - find the contact(s) with this phone number",
+    f"\t{YELLOW}fuzzy {CYAN}<name> {GRAY}<count>                    {RESET} - contacts with the most similar names (for typos), {GRAY}<count>(optional, 3){RESET}",
+    f"\t{YELLOW}query {CYAN}<field:value>{GRAY}*n                  {RESET} - contacts matching all conditions, fields: name, phone, email, addr, bd",
+    f"\t{GRAY}                                                (e.g. 'query phone:067* email:gmail bd:<30d addr:kyiv name:~jon'){RESET}",
+    f"\t{YELLOW}stats                                    {RESET} - statistics of the search cache and indexes",
     f"\t{YELLOW}sort_path {CYAN}<path>                         {RESET} - sort files by in the folders",
     f"\t{YELLOW}exit                                     {RESET} - exit from PhoneBook",
     f"\t{YELLOW}help                                     {RESET} - this help-page",
-    # 31
+    # 37
 ]
 
 HELP_LIST_ADD = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
 HELP_LIST_EDIT = [10, 11, 12, 13, 14, 15, 16]
 HELP_LIST_DEL = [17, 18, 19, 20, 21, 22]
 HELP_LIST_CONTACT = [0, 1, 10, 17]
-HELP_LIST_PHONE = [2, 3, 11, 18]
+HELP_LIST_PHONE = [2, 3, 11, 18, 30]
 HELP_LIST_NOTE = [7, 8, 9, 15, 16, 21, 22, 27]
-HELP_LIST_FIND = [23, 24, 26, 27]
+HELP_LIST_FIND = [23, 24, 26, 27, 30, 31, 32, 33]
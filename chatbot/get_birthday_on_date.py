@@ -1,4 +1,4 @@
-from datetime import date, timedelta
+from datetime import date
 
 from .classes import (
     Name,
@@ -26,31 +26,13 @@ def user_error(func):
             return f"{RED}Address book not created. Please create Address book first{RESET}"
     return inner
 
-def get_period(start_date: date, days: int) -> dict:
-    result = {}
-    for _ in range(days + 1):
-        result[start_date.day, start_date.month] = start_date.year
-        start_date += timedelta(1)
-    return result
-
 @user_error
 def get_birthdays_on_date(users: AddressBook, days=None):
-    Birthday_people = []
-
     if not days:
         days = 0
 
-    start_date = date.today()
-    period = get_period(start_date, days)
-
-    for name, record in users.data.items():
-        try:
-            birthday: date = record.birthday.value
-        except AttributeError:
-            continue
-        date_birthday = birthday.day, birthday.month
-        if date_birthday in list(period):
-            Birthday_people.append(record)
+    # дні з date.today() по date.today() + days - з календарного індексу книги
+    Birthday_people = users.birthdays_within(days, date.today())
 
     if not Birthday_people:
         if not (days == 0 or days == 1):
@@ -0,0 +1,422 @@
+from bisect import bisect_left, bisect_right, insort
+import calendar
+from datetime import date
+from operator import itemgetter
+
+from .paging import LAST_CHAR
+from .sort_path import TRANS
+
+# =============================================
+#        індекси AddressBook у пам'яті
+# =============================================
+# індекс будується при першому зверненні і далі підтримується книгою
+# (add_record, delete_record, record_changed); для кожного імені
+# запам'ятовуються його ключі, тож оновлення не потребує старих значень полів
+
+
+def canonical_name(name) -> str:
+    # "  tom   SMITH " -> "tom smith"
+    return " ".join(str(name).split()).casefold()
+
+
+class Index:
+    def __init__(self) -> None:
+        self.map = {}  # ключ -> множина імен
+        self.keys_of = {}  # ім'я -> ключі цього імені
+
+    def keys(self, record):
+        raise NotImplementedError
+
+    def build(self, book):
+        for name in book.data:
+            self.add(book.data[name])
+        return self
+
+    def add_keys(self, name, keys):
+        keys = set(keys)
+        self.keys_of[name] = keys
+        for key in keys:
+            self.map.setdefault(key, set()).add(name)
+
+    def add(self, record):
+        self.discard(record.name.value)
+        self.add_keys(record.name.value, self.keys(record))
+
+    def discard(self, name):
+        for key in self.keys_of.pop(name, ()):
+            names = self.map[key]
+            names.discard(name)
+            if not names:
+                del self.map[key]
+
+    def lookup(self, key) -> set:
+        return self.map.get(key, set())
+
+    def __len__(self):
+        return len(self.keys_of)
+
+
+class NameIndex(Index):
+    # canonical_name -> ім'я у книзі
+    key = staticmethod(canonical_name)
+
+    def keys(self, record):
+        return [self.key(record.name.value)]
+
+    def build(self, book):
+        # лише імена: записи лінивого сховища не розбираються
+        for name in book.data:
+            self.add_keys(name, [self.key(name)])
+        return self
+
+
+# ---------- транслітерація та звучання імен ----------
+TRANSLIT = str.maketrans(TRANS)  # кирилиця -> латиниця, як у sort_path
+
+# буквосполучення, що звучать однаково в різних транслітераціях;
+# великі літери - окремі звуки, які не плутаються з одиночними буквами
+SOUND_GROUPS = (
+    ("shch", "S"),
+    ("sch", "S"),
+    ("sh", "S"),
+    ("ch", "C"),
+    ("zh", "Z"),
+    ("kh", "h"),
+    ("ts", "C"),
+    ("tz", "C"),
+    ("ph", "f"),
+    ("th", "t"),
+    ("ck", "k"),
+    ("x", "ks"),
+    ("q", "k"),
+    ("w", "v"),
+    ("c", "k"),
+)
+# схожі приголосні - один клас; голосні, j, y та апострофи відкидаються
+SOUND_CLASSES = str.maketrans("pfgzd", "bvhst", "aeiouyj'`")
+# перша літера лишається (як у Soundex): голосна - "a", y/j - "j"
+SOUND_FIRST = str.maketrans("pfgzdeiouy", "bvhstaaaaj", "'`")
+MIN_SOUND_KEY = 3  # коротші ключі (Jon, Anna, Ella) збігаються надто часто
+
+
+def latin_name(name) -> str:
+    # "Олена  Пчілка" -> "olena pchilka"
+    return canonical_name(name).translate(TRANSLIT)
+
+
+def sound_key(name) -> str:
+    # "Oleksandr" і "Олександр", "Alexander" -> "alksntr": перша літера і
+    # приголосні далі, з однаковими класами приголосних і без повторів підряд;
+    # "" - ключ закороткий, щоб щось означати
+    words = []
+    for word in latin_name(name).split():
+        for group, sound in SOUND_GROUPS:
+            word = word.replace(group, sound)
+        word = word[:1].translate(SOUND_FIRST) + word[1:].translate(SOUND_CLASSES)
+        words.append("".join(c for i, c in enumerate(word) if word[i - 1 : i] != c))
+    key = " ".join(word for word in words if word)
+    return key if len(key.replace(" ", "")) >= MIN_SOUND_KEY else ""
+
+
+class PhoneticIndex(Index):
+    # ("latin", транслітероване ім'я) - те саме ім'я іншою абеткою,
+    # ("sound", sound_key) - імена, що звучать схоже; обидва - один пошук у dict
+    def keys(self, record):
+        return self.name_keys(record.name.value)
+
+    @staticmethod
+    def name_keys(name):
+        keys = [("latin", latin_name(name))]
+        if sound := sound_key(name):
+            keys.append(("sound", sound))
+        return keys
+
+    def build(self, book):
+        for name in book.data:
+            self.add_keys(name, self.name_keys(name))
+        return self
+
+    def latin(self, name) -> set:
+        return self.lookup(("latin", latin_name(name)))
+
+    def sounds_like(self, name) -> list:
+        # імена з тим самим звучанням; спершу ті, що збігаються транслітерацією
+        latin = self.latin(name)
+        names = self.lookup(("sound", sound_key(name))) - latin
+        return sorted(latin) + sorted(names)
+
+
+class PhoneIndex(Index):
+    # нормалізований номер (Phone.value) -> імена
+    def keys(self, record):
+        return [phone.value for phone in record.phones]
+
+
+NGRAM = 3  # довжина n-грами; коротші запити перевіряються перебором
+
+
+def search_texts(record):
+    # рядки запису, серед яких шукає команда search (у нижньому регістрі)
+    yield record.name.value.lower()
+    for phone in record.phones:
+        yield phone.value
+    for email in record.emails:
+        yield email.value.lower()
+    if record.address:
+        yield record.address.value.lower()
+    if record.birthday:
+        yield record.birthday.value.strftime("%d-%m-%Y")
+
+
+def ngrams(text):
+    return {text[i : i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class TrigramIndex(Index):
+    # триграма -> імена; n-грами беруться з кожного поля окремо
+    def keys(self, record):
+        keys = set()
+        for text in search_texts(record):
+            keys |= ngrams(text)
+        return keys
+
+    def candidates(self, text) -> set:
+        # імена, у записах яких є всі n-грами text (підрядок ще треба перевірити)
+        found = sorted((self.lookup(gram) for gram in ngrams(text.lower())), key=len)
+        if not found:
+            return set()
+        result = set(found[0])
+        for names in found[1:]:
+            result &= names
+            if not result:
+                break
+        return result
+
+
+class SortedIndex(Index):
+    # відсортований список (ключ, ім'я): діапазонні запити через bisect
+    def __init__(self) -> None:
+        super().__init__()
+        self.entries = []
+
+    def build(self, book):
+        for name in book.data:
+            self.keys_of[name] = set(self.keys(book.data[name]))
+        self.entries = sorted(
+            (key, name) for name, keys in self.keys_of.items() for key in keys
+        )
+        return self
+
+    def add_keys(self, name, keys):
+        keys = set(keys)
+        self.keys_of[name] = keys
+        for key in keys:
+            insort(self.entries, (key, name))
+
+    def discard(self, name):
+        for key in self.keys_of.pop(name, ()):
+            del self.entries[bisect_left(self.entries, (key, name))]
+
+    def range(self, low, high) -> list:
+        # імена з ключами low <= key <= high у порядку ключів
+        start = bisect_left(self.entries, low, key=itemgetter(0))
+        end = bisect_right(self.entries, high, key=itemgetter(0))
+        return [name for _, name in self.entries[start:end]]
+
+    def lookup(self, key) -> set:
+        return set(self.range(key, key))
+
+
+# ---------- дні народження ----------
+# ключ - день року як число mmdd (29 лютого - 229, між 228 і 301)
+
+
+def day_key(day) -> int:
+    return day.month * 100 + day.day
+
+
+def birthday_in(born, year) -> date:
+    # 29 лютого у невисокосний рік святкується 1 березня
+    if (born.month, born.day) == (2, 29) and not calendar.isleap(year):
+        return date(year, 3, 1)
+    return date(year, born.month, born.day)
+
+
+def next_birthday(born, today) -> date:
+    birthday = birthday_in(born, today.year)
+    if birthday < today:
+        birthday = birthday_in(born, today.year + 1)
+    return birthday
+
+
+def birthday_windows(today, days):
+    # діапазони ключів для днів today ... today + days;
+    # через Новий рік - два діапазони, у порядку настання
+    low = day_key(today)
+    if low == 301 and not calendar.isleap(today.year):
+        low = 229  # 1 березня невисокосного року - і для народжених 29 лютого
+    if days >= 365:
+        return [(low, 1231), (101, low - 1)]
+    end = date.fromordinal(today.toordinal() + days)
+    if end.year == today.year:
+        return [(low, day_key(end))]
+    return [(low, 1231), (101, day_key(end))]
+
+
+class BirthdayIndex(SortedIndex):
+    def keys(self, record):
+        return [day_key(record.birthday.value)] if record.birthday else []
+
+
+# ---------- e-mail ----------
+def reversed_domain(domain) -> str:
+    # "mail.ukr.net" -> "net.ukr.mail.": піддомени стають продовженням ключа
+    return ".".join(reversed(domain.split("."))) + "."
+
+
+class EmailIndex(SortedIndex):
+    # ("email", адреса) - пошук за початком адреси,
+    # ("domain", перевернутий домен) - усі адреси домену та його піддоменів
+    def keys(self, record):
+        keys = []
+        for email in record.emails:
+            value = email.value.lower()
+            keys.append(("email", value))
+            keys.append(("domain", reversed_domain(value.rpartition("@")[2])))
+        return keys
+
+    def _names(self, kind, prefix) -> list:
+        # імена без повторів (у запису може бути кілька таких адрес)
+        return sorted(set(self.range((kind, prefix), (kind, prefix + LAST_CHAR))))
+
+    def prefix(self, text) -> list:
+        return self._names("email", text.lower())
+
+    def domain(self, domain) -> list:
+        return self._names("domain", reversed_domain(domain.lower().lstrip("@")))
+
+
+# ---------- нечіткий пошук імен ----------
+def edit_distance(a: str, b: str) -> int:
+    # відстань Левенштейна, два рядки таблиці; спільні початок і кінець
+    # на відстань не впливають і відкидаються одразу
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    a, b = a[start:], b[start:]
+    while a and b and a[-1] == b[-1]:
+        a, b = a[:-1], b[:-1]
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    previous = range(len(b) + 1)
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        left = i  # current[j]: без min() - помітно швидше
+        for j, char_b in enumerate(b):
+            replace = previous[j] if char_a == char_b else previous[j] + 1
+            insert = previous[j + 1] + 1
+            left += 1
+            if insert < left:
+                left = insert
+            if replace < left:
+                left = replace
+            current.append(left)
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    # дерево Буркхарда-Келлера: вузол - (слово, {відстань: нащадок});
+    # пошук заходить лише у гілки, де |відстань - d| <= допуск
+    def __init__(self) -> None:
+        self.root = None
+        self.size = 0
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word, tolerance) -> list:
+        # [(відстань, слово)] для слів не далі tolerance
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = edit_distance(word, node_word)
+            if distance <= tolerance:
+                found.append((distance, node_word))
+            for edge, child in children.items():
+                if distance - tolerance <= edge <= distance + tolerance:
+                    stack.append(child)
+        return found
+
+
+def fuzzy_tolerance(word) -> int:
+    # скільки помилок допускається у слові такої довжини
+    return max(2, len(word) // 3)
+
+
+class FuzzyIndex(NameIndex):
+    # latin_name -> імена + BK-дерево транслітерованих імен ("олена" - це
+    # "olena"); видалені імена лишаються у дереві, доки їх не стане більше, ніж живих
+    key = staticmethod(latin_name)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tree = BKTree()
+
+    def add_keys(self, name, keys):
+        for key in keys:
+            if key not in self.map:
+                self.tree.add(key)
+        super().add_keys(name, keys)
+
+    def discard(self, name):
+        super().discard(name)
+        if self.tree.size > 2 * len(self.map) + 100:
+            self.tree = BKTree()
+            for key in self.map:
+                self.tree.add(key)
+
+    def closest(self, name, limit=3, tolerance=None) -> list:
+        # [(відстань, ім'я)] найближчих імен, не більше limit; допуск
+        # збільшується поступово - малий допуск відсікає майже все дерево
+        word = self.key(name)
+        if tolerance is None:
+            tolerance = fuzzy_tolerance(word)
+        result = []
+        for step in range(1, tolerance + 1):
+            result = []
+            for distance, key in sorted(self.tree.search(word, step)):
+                if key in self.map:
+                    result.extend((distance, name) for name in sorted(self.map[key]))
+            if len(result) >= limit:
+                break
+        return result[:limit]
+
+    def within(self, name, tolerance=None) -> set:
+        # усі імена не далі tolerance від name
+        word = self.key(name)
+        if tolerance is None:
+            tolerance = fuzzy_tolerance(word)
+        names = set()
+        for _, key in self.tree.search(word, tolerance):
+            names |= self.map.get(key, set())
+        return names
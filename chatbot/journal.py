@@ -0,0 +1,284 @@
+from contextlib import contextmanager
+import gc
+import os.path
+import pickle
+
+from .constants import RED, GRAY, RESET, SNAPSHOT_KEEP
+from .snapshot import check_snapshot, read_snapshot, write_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows - без блокування між процесами
+    fcntl = None
+
+UNCHANGED = f"{GRAY}there are no changes to save{RESET}"  # compact() без змін
+
+
+@contextmanager
+def file_lock(fn):
+    # advisory-блокування для кількох процесів, що працюють з одним файлом
+    if fcntl is None:
+        yield
+        return
+    with open(fn + ".lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def disk_generation(fn):
+    # покоління знімка на диску за його заголовком (O(1))
+    if not os.path.exists(fn):
+        return 0
+    checked = check_snapshot(fn)
+    return checked[0] if checked else None  # None - старий або пошкоджений файл
+
+
+class Journal:
+    # append-only журнал змін: кожен запис - одна операція над книгою;
+    # перший запис - ("generation", n) - покоління знімка, до якого журнал дописує
+    def __init__(self, fn, generation=0) -> None:
+        self.fn = fn
+        self.generation = generation
+        self.count = 0
+        self.pending = []
+        self.offset = 0  # до якого місця файл уже прочитаний/записаний нами
+
+    def append(self, entry: tuple):
+        # запис потрапляє у файл під час flush (разом з іншими з тієї ж серії)
+        self.pending.append(entry)
+        self.count += 1
+
+    def flush(self):
+        if not self.pending:
+            return
+        with open(self.fn, "ab") as fh:
+            if not fh.tell():
+                pickle.dump(("generation", self.generation), fh)
+            for entry in self.pending:
+                pickle.dump(entry, fh)
+            self.offset = fh.tell()
+        self.pending = []
+
+    def entries(self, start=0):
+        if not os.path.exists(self.fn):
+            return
+        with open(self.fn, "rb") as fh:
+            fh.seek(start)
+            while True:
+                try:
+                    entry = pickle.load(fh)
+                    self.offset = fh.tell()
+                    yield entry
+                except EOFError:
+                    return
+                except (pickle.UnpicklingError, AttributeError, ValueError):
+                    # обірваний останній запис (аварійне завершення) - далі нічого немає
+                    return
+
+    def replay(self, book):
+        # лише під file_lock(self.fn): журнал від старого знімка очищується
+        self.count = 0
+        self.offset = 0
+        for entry in self.entries():
+            if entry[0] == "generation":
+                if entry[1] < self.generation:
+                    # журнал від старого знімка (збій між записом знімка
+                    # та очищенням журналу) - його зміни вже у знімку
+                    self.clear(self.generation)
+                    return 0
+                if entry[1] > self.generation:
+                    # журнал новішого знімка (ми прочитали резервну копію) -
+                    # не наш, але й не стираємо його
+                    return 0
+                continue
+            book.apply(entry)
+            self.count += 1
+        return self.count
+
+    def merge(self, book):
+        # дописане іншими процесами після нашого останнього читання
+        size = os.path.getsize(self.fn) if os.path.exists(self.fn) else 0
+        if size <= self.offset:
+            return 0
+        merged = 0
+        for entry in self.entries(self.offset):
+            if entry[0] != "generation":
+                book.apply(entry)
+                self.count += 1
+                merged += 1
+        return merged
+
+    def clear(self, generation=None):
+        if generation is not None:
+            self.generation = generation
+        with open(self.fn, "wb"):
+            pass
+        self.count = 0
+        self.pending = []
+        self.offset = 0
+
+
+class Journaled:
+    # спільна частина AddressBook і NotesBook: логування операцій у журнал
+    journal = None
+    journal_limit = None
+    dirty = False  # є зміни, які ще не записані на диск
+    snapshot_generation = 0  # номер останнього знімка на диску
+    version = 0  # лічильник змін книги у пам'яті
+
+    def _log(self, *entry):
+        self.dirty = True
+        self.version += 1
+        if self.journal is not None:
+            self.journal.append(entry)
+
+    def apply(self, entry: tuple):
+        target, *op = entry
+        if target == "record":
+            name, method, args = op
+            obj = self.data.get(name)
+            if obj is None:
+                return
+        else:
+            method, args = op
+            obj = self
+        getattr(obj, method)(*args)
+
+    def attach_journal(self, fn, limit=None):
+        # викликати під file_lock(fn) разом з читанням знімка: інакше інший
+        # процес може між ними стиснути журнал, і replay зітре його нові записи
+        journal = Journal(fn, self.snapshot_generation)
+        journal.replay(self)
+        self.journal = journal
+        self.journal_limit = limit
+        self.dirty = False
+        return self
+
+    def _sync(self, fn):
+        # (під file_lock) підтягує зміни інших процесів: якщо хтось записав
+        # новий знімок - перечитуємо його, інакше лише новий хвіст журналу
+        journal, self.journal = self.journal, None
+        dirty = self.dirty
+        try:
+            generation = disk_generation(fn)
+            if generation is not None and generation != self.snapshot_generation:
+                self._reload(fn, journal)
+            elif journal.merge(self) and journal.pending:
+                # у файлі наші записи стануть після чужих - у пам'яті теж:
+                # застосовуємо їх ще раз і одразу дописуємо (ми під file_lock)
+                for entry in journal.pending:
+                    self.apply(entry)
+                journal.flush()
+        finally:
+            self.journal = journal
+            self.dirty = dirty
+
+    def _reload(self, fn, journal):
+        loaded = self._load_snapshot(fn)
+        self._adopt(loaded if loaded is not None else type(self)())
+        self.version += 1
+        self.snapshot_generation = loaded.snapshot_generation if loaded else 0
+        journal.generation = self.snapshot_generation
+        pending = journal.pending
+        journal.replay(self)
+        # наші ще не записані зміни - поверх свіжих даних
+        for entry in pending:
+            self.apply(entry)
+        journal.pending = pending
+        journal.count += len(pending)
+
+    def _adopt(self, other):
+        self.data = other.data
+
+    def refresh(self, fn):
+        if self.journal is not None:
+            with file_lock(self.journal.fn):
+                self._sync(fn)
+
+    def _compact(self, fn):
+        # знімок усієї книги + порожній журнал
+        journal, self.journal = self.journal, None
+        try:
+            result = self._snapshot(fn)
+        finally:
+            self.journal = journal
+        if journal is not None:
+            journal.clear(self.snapshot_generation)
+        self.dirty = False
+        return result
+
+    def compact(self, fn):
+        # сесія без змін (і порожній журнал) не переписує знімок
+        if self.journal is None:
+            return self._compact(fn) if self.dirty else UNCHANGED
+        with file_lock(self.journal.fn):
+            self._sync(fn)
+            if not self.dirty and not self.journal.count:
+                return UNCHANGED
+            # якщо знімок не вдасться записати, зміни лишаться в журналі
+            self.journal.flush()
+            return self._compact(fn)
+
+    def save(self, fn):
+        # дописує накопичені зміни; повний знімок - лише коли журнал виріс
+        if self.journal is None:
+            result = self._snapshot(fn)
+        else:
+            with file_lock(self.journal.fn):
+                self._sync(fn)
+                if self.journal_limit and self.journal.count >= self.journal_limit:
+                    self.journal.flush()
+                    result = self._compact(fn)
+                else:
+                    self.journal.flush()
+                    result = None
+        self.dirty = False
+        return result
+
+    def _snapshot(self, fn):
+        raise NotImplementedError
+
+    def _encode(self) -> bytes:
+        raise NotImplementedError
+
+    def _decode(self, payload: bytes):
+        raise NotImplementedError
+
+    def _load_snapshot(self, fn):
+        # книга з останнього цілого знімка (або None)
+        snapshot = read_snapshot(fn, SNAPSHOT_KEEP)
+        if snapshot is None:
+            if os.path.exists(fn):
+                print(f"{RED}file {fn} is damaged and there is no backup copy{RESET}")
+            return None
+        payload, generation, used_fn = snapshot
+        if used_fn != fn:
+            print(f"{RED}file {fn} is damaged, restored from {used_fn}{RESET}")
+        # мільйони дрібних об'єктів: збирач сміття лише заважає
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            book = self._decode(payload)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        book.snapshot_generation = generation
+        return book
+
+    def _save_snapshot(self, fn):
+        self.snapshot_generation += 1
+        payload = self._encode()
+        write_snapshot(fn, payload, self.snapshot_generation, SNAPSHOT_KEEP)
+        return payload
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("journal", None)
+        state.pop("journal_limit", None)
+        state.pop("dirty", None)
+        state.pop("snapshot_generation", None)
+        state.pop("version", None)
+        return state
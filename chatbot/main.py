@@ -2,19 +2,24 @@ from .classes import (
     Name,
     Phone,
     Email,
-    Address,
     Record,
     AddressBook,
-    BirthDay,
     PhoneError,
     BDayError,
     EmailError,
-    NoContactError,
+    FieldError,
 )
 from .constants import (
     TITLE,
     FILENAME,
     NOTE_FILENAME,
+    NOTES_DIR,
+    JOURNAL_SUFFIX,
+    JOURNAL_LIMIT,
+    STORAGE_BACKEND,
+    SQLITE_FILENAME,
+    AUTOSAVE_DELAY,
+    RESULT_CACHE_SIZE,
     HELP_LIST,
     HELP_LIST_ADD,
     HELP_LIST_EDIT,
@@ -25,7 +30,6 @@ from .constants import (
     HELP_LIST_FIND,
     RED,
     BLUE,
-    YELLOW,
     CYAN,
     GRAY,
     WHITE,
@@ -33,9 +37,7 @@ from .constants import (
     MAGENTA,
 )
 
-from .notes import NotesBook, NoteError, Title, Content, Tags, Note
-
-from .get_birthday_on_date import get_birthdays_on_date
+from .notes import NotesBook, LazyNotesBook, NoteError
 
 from prompt_toolkit.completion import NestedCompleter
 
@@ -43,8 +45,22 @@ from prompt_toolkit import prompt
 
 from .sort_path import sorting
 
+from .autosave import AutoSaver
+from .journal import file_lock
+from .binformat import MAX_ITEMS
+
+from .transfer import import_contacts, export_contacts
+
+from .query import Query, QueryError
+
+from .cache import ResultCache
+
+from datetime import date
+
 book = AddressBook()
 notes = NotesBook()
+saver = None
+results = ResultCache(RESULT_CACHE_SIZE)
 
 
 def user_error(func):
@@ -63,6 +79,8 @@ def user_error(func):
             return f"{RED}the phone number must contains only digits, format: '0671234567' or '+380671234567'{RESET}"
         except EmailError as ee:
             return f"{RED} {ee}{RESET}"
+        except FieldError as fe:
+            return f"{fe}"
         # except AttributeError:
         #    return f"{RED}phone number {args[1]} is not among the contact numbers of {args[0]} {RESET}"
         except AttributeError as ae:
@@ -71,85 +89,113 @@ def user_error(func):
             return f"{RED} {ve}{RESET}"
         except NoteError as ne:
             return f"{RED} {ne}{RESET}"
+        except QueryError as qe:
+            return f"{RED}{qe}{RESET}\n\tFormat: 'query name:~jon phone:067* email:gmail addr:kyiv bd:<30d'"
 
     return inner
 
 
+def cached(func):
+    # результат не зміниться, доки не змінилася книга (version) і дата
+    # (у виводі контакту - дні до дня народження)
+    def inner(*args):
+        normalized = tuple(str(arg).strip().casefold() for arg in args)
+        key = (func.__name__, normalized, id(book), book.version, date.today())
+        return results.get(key, lambda: func(*args))
+
+    return inner
+
+
+def not_found(name, book):
+    # підказка "did you mean" шукається лише тут - коли її справді покажуть
+    return (
+        f"{RED}contact {WHITE}{name}{RED} not found in address book{RESET}"
+        + book.did_you_mean(name)
+    )
+
+
 def get_record_or_error(name, book, return_error=False):
-    name_rec = Name(name)
-    rec = book.get(str(name_rec))
-    if not rec:
-        error_message = (
-            f"{RED}contact {WHITE}{name}{RED} not found in address book{RESET}"
-        )
-        if return_error:
-            return error_message
-        else:
-            return rec
+    rec = book.find_record(name)
+    if not rec and return_error:
+        return not_found(name, book)
     return rec
 
 
 @user_error
 def add_birthday(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).add_birthday((args[1]))
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.add_birthday((args[1]))
+    return not_found(args[0], book)
 
 
 @user_error
 def add_address(*args):
-    if get_record_or_error(args[0], book):
+    rec = book.find_record(args[0])
+    if rec:
         addr_str = ""
         # join args with " " starting from 1
         addr_str = " ".join(args[1:])
         print(addr_str)
-        return get_record_or_error(args[0], book).add_address((addr_str))
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+        return rec.add_address((addr_str))
+    return not_found(args[0], book)
 
 
 @user_error
 def add_email(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).add_email(args[1])
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.add_email(args[1])
+    return not_found(args[0], book)
 
 
 @user_error
 def add_contact(*args):
-    if get_record_or_error(args[0], book):
-        return f"{RED}contact {Name(args[0])} already exist{RESET}\n\t{get_record_or_error(args[0], book)}\n\tUse 'add_phone' or 'change' command to add or change the phone"
-    book.add_record(Record(args[0]))
+    # новий контакт - звичайний промах пошуку: підказка тут не потрібна
+    rec = book.find_record(args[0])
+    if rec:
+        return f"{RED}contact {Name(args[0])} already exist{RESET}\n\t{rec}\n\tUse 'add_phone' or 'change' command to add or change the phone"
+    rec = Record(args[0])
+    book.add_record(rec)
 
     if len(args) > 1:
         if all([args[-1][2] == args[-1][5] == "-", len(args[-1]) == 10]):
-            add_birthday(args[0], args[-1])
+            try:
+                rec.add_birthday(args[-1])
+            except (ValueError, BDayError):
+                pass  # некоректна дата не заважає додати контакт
             args = args[:-1]
-        add_phones(args[0], *args[1:])
+        add_few_phones(rec, *args[1:])
 
-    return f"contact {Name(args[0])} has been successfully added \n\t{get_record_or_error(args[0],book)}"
+    return f"contact {Name(args[0])} has been successfully added \n\t{rec}"
 
 
 @user_error
 def add_few_phones(rec, *args):
+    # номери перевіряються разом; некоректні не заважають додати решту
+    phones, errors = Phone.normalize_many(args)
     result = ""
-    for phone in args:
+    for value in phones:
+        phone = Phone.restore(value)
+        if phone in rec.phones:
+            result += f"{RED}number {phone} is already present in {rec.name}'s contact list{RESET}\n"
+            continue
+        if len(rec.phones) >= MAX_ITEMS:
+            result += f"{RED}contact {rec.name} already has {MAX_ITEMS} phone numbers{RESET}\n"
+            break
         rec.add_phone(phone)
-        result += (
-            f"phone number {Phone(phone)} has been added to {rec.name}'s contact list\n"
-        )
+        result += f"phone number {phone} has been added to {rec.name}'s contact list\n"
+    for _, error in errors:
+        result += f"{error}\n"
     return result
 
 
 @user_error
 def add_phones(*args):
-    rec = get_record_or_error(args[0], book)
+    rec = book.find_record(args[0])
     if rec:
         return add_few_phones(rec, *args[1:]) + f"\t{rec}"
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    return not_found(args[0], book)
 
 
 @user_error
@@ -159,54 +205,50 @@ def change_name(*args):
 
 @user_error
 def change_phone(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).edit_phone(
-            Phone(args[1]), Phone(args[2])
-        )
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.edit_phone(Phone(args[1]), Phone(args[2]))
+    return not_found(args[0], book)
 
 
 @user_error
 def change_email(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).edit_email(
-            Email(args[1]), Email(args[2])
-        )
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.edit_email(args[1], Email(args[2]))
+    return not_found(args[0], book)
 
 
 @user_error
 def del_phone(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).remove_phone(Phone(args[1]))
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.remove_phone(Phone(args[1]))
+    return not_found(args[0], book)
 
 
 @user_error
 def del_email(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).remove_email(Email(args[1]))
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.remove_email(args[1])
+    return not_found(args[0], book)
 
 
 @user_error
 def change_address(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).edit_address(args[1])
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.edit_address(args[1])
+    return not_found(args[0], book)
 
 
 @user_error
 def del_address(*args):
-    if get_record_or_error(args[0], book):
-        return get_record_or_error(args[0], book).remove_address()
-    else:
-        return f"{RED}contact {WHITE}{args[0]}{RED} not found in address book{RESET}"
+    rec = book.find_record(args[0])
+    if rec:
+        return rec.remove_address()
+    return not_found(args[0], book)
 
 
 @user_error
@@ -215,6 +257,7 @@ def delete_record(*args):
 
 
 @user_error
+@cached
 def name_find(*args):
     return book.find_name(args[0])
 
@@ -267,7 +310,7 @@ def edit_note(title, *args):
     print(f"{new_content = }")
     if title in notes.data:
         # Змінюємо тільки content
-        notes.data[title].content.edit_content(new_content)
+        notes.edit_note(title, new_content)
         return f"Note '{title}' changed. New content: '{new_content}'\n\t{notes.data[title]}"
     else:
         return f"note '{title}' not found."
@@ -343,63 +386,135 @@ def delete_tag(*args):
 
 
 @user_error
+@cached
+def fuzzy(*args):
+    found = book.fuzzy(args[0], int(args[1]) if len(args) > 1 else 3)
+    if not found:
+        return f"{RED}no contacts with a name similar to {WHITE}{args[0]}{RESET}"
+    lines = "\n".join(f"\t{GRAY}({d}){RESET} {record}" for d, record in found)
+    return f"contacts with a name similar to {args[0]}:\n{lines}"
+
+
+@user_error
+def query(*args):
+    found = Query(" ".join(args))
+    count = 0
+    # записи друкуються по мірі знаходження
+    for record in found.run(book):
+        print(record)
+        count += 1
+    if not count:
+        return f"{RED}nothing was found for your request '{found.text}'{RESET}"
+    return f"  --- {count} contacts found {GRAY}({found.explain}){RESET} ---"
+
+
+@user_error
+@cached
+def who(*args):
+    phone = Phone(args[0])
+    records = book.find_by_phone(phone)
+    if not records:
+        return f"{RED}phone number {phone} not found in address book{RESET}"
+    found = "\n".join(f"\t{record}" for record in records)
+    return f"phone number {phone} belongs to:\n{found}"
+
+
+@user_error
+@cached
 def search(*args):
-    result = ""
+    result = []
     if not args:
         return f"{RED}searching string is required{RESET}"
     seek = args[0].lower()
-    for record in book.data.values():
+    # лише записи-кандидати з триграмного індексу
+    for record in book.search(seek):
         if seek.isdigit():
             if record.seek_phone(seek):
-                result += f"\t{BLUE}[   Phone match] {RESET}{record}\n"
+                result.append(f"\t{BLUE}[   Phone match] {RESET}{record}")
             if record.birthday:
                 date_str = record.birthday.value.strftime("%d-%m-%Y")
                 if date_str.find(seek) != -1:
-                    result += f"\t{MAGENTA}[Birthday match] {RESET}{record}\n"
+                    result.append(f"\t{MAGENTA}[Birthday match] {RESET}{record}")
 
         if seek in record.name.value.lower():
-            result += f"\t{CYAN}[ Name match] {RESET}{record}\n"
+            result.append(f"\t{CYAN}[ Name match] {RESET}{record}")
         if record.seek_email(seek):
-            result += f"\t{BLUE}[Email match] {RESET}{record}\n"
+            result.append(f"\t{BLUE}[Email match] {RESET}{record}")
         if record.address:
             addr_str = record.address.value.lower()
             if addr_str.find(seek) != -1:
-                result += f"\t{GRAY}[ Address match] {RESET}{record}\n"
+                result.append(f"\t{GRAY}[ Address match] {RESET}{record}")
 
     if result:
-        return f"data found for your request '{seek}': \n{result[:-1]}"
+        found = "\n".join(result)
+        return f"data found for your request '{seek}': \n{found}"
     else:
         return f"{RED}nothing was found for your request '{seek}'{RESET}"
 
 
 @user_error
 def show_all(*args):
-    pages = int(args[0]) if args else len(book.data)
+    if args and not (args[0].isdigit() and int(args[0]) > 0):
+        return f"{RED}the page size must be a positive number{RESET}"
+    size = int(args[0]) if args else None
     print(f"  === Address book ===")
-    count = 0
-    for _ in book.iterator(pages):
-        for item in _:
-            print(item)
-            count += 1
-        if count < len(book):
-            input(f"  Press Enter for next page: ")
+    cursor = None
+    while True:
+        # сторінка за курсором, кожен запис друкується одразу
+        records, cursor = book.page(cursor, size)
+        for record in records:
+            print(record)
+        if cursor is None:
+            break
+        input(f"  Press Enter for next page: ")
     return "  --- End of List ---"
 
 
 @user_error
 def show_notes(*args):
-    pages = int(args[0]) if args else len(notes.data)
+    if args and not (args[0].isdigit() and int(args[0]) > 0):
+        return f"{RED}the page size must be a positive number{RESET}"
+    size = int(args[0]) if args else None
     print(f"  === Notes ===")
-    count = 0
-    for _ in notes.iterator(pages):
-        for item in _:
+    cursor = None
+    while True:
+        items, cursor = notes.page(cursor, size)
+        for item in items:
             print(item)
-            count += 1
-        if count < len(notes):
-            input(f"  Press Enter for next page: ")
+        if cursor is None:
+            break
+        input(f"  Press Enter for next page: ")
     return "  --- End of List ---"
 
 
+@user_error
+def import_file(*args):
+    result = import_contacts(book, args[0])
+    # імпорт - одне повне збереження замість тисяч записів у журналі
+    book.compact(FILENAME)
+    return result
+
+
+@user_error
+def export_file(*args):
+    return export_contacts(book, args[0])
+
+
+def stats(*_):
+    ratio = results.hits / (results.hits + results.misses or 1)
+    indexes = ", ".join(
+        f"{kind} ({len(index)})" for kind, index in book.indexes.items()
+    )
+    return (
+        f"  === Statistics ===\n"
+        f"\tcontacts      : {len(book)}\n"
+        f"\tbook version  : {book.version}\n"
+        f"\tresult cache  : {len(results)}/{results.size} entries, "
+        f"{results.hits} hits, {results.misses} misses ({ratio:.0%} hits)\n"
+        f"\tindexes built : {indexes or 'none'}"
+    )
+
+
 def help_part(*args):
     help_list = []
     for i in args[0]:
@@ -450,7 +565,10 @@ def say_hello(*_):
 
 
 def say_good_bay(*_):
-    print(book.write_contacts_to_file(FILENAME))
+    if saver:
+        saver.stop()
+    print(book.compact(FILENAME))
+    print(notes.compact(NOTE_FILENAME))
     exit("Good bye!")
 
 
@@ -461,14 +579,11 @@ def unknown(*_):
 # from datetime import datetime
 
 
+@cached
 def birthday(days=0):
-    list_birthday = []
     result = f'  === Contacts whose birthday is {"in the next "+str(days)+" days" if days else "today"} ===\n'
-    for item in book:
-        rec = get_record_or_error(item, book)
-        if rec.birthday:
-            if int(rec.days_to_birthday(rec.birthday)[0]) <= int(days):
-                list_birthday.append(rec)
+    # календарний індекс: лише записи з потрібних днів, одразу за датою
+    list_birthday = book.birthdays_within(int(days))
     if len(list_birthday) == 0:
         return f'{RED}there are no contacts whose birthday is {"in the next "+str(days)+" days" if days else "today"}{RESET}'
 
@@ -507,9 +622,13 @@ COMMANDS = {
     del_email: ("delete_email", "del_email"),
     delete_note: ("delete_note", "del_note"),
     name_find: ("name", "find_name"),
+    fuzzy: ("fuzzy", "similar"),
     birthday: ("birthdays", "birthday", "find_birthdays", "bd"),
     search: ("search", "seek", "find_any"),
+    query: ("query", "q", "select"),
+    who: ("who", "find_phone", "who_is"),
     help_page: ("help",),
+    stats: ("stats", "statistics"),
     say_hello: ("hello", "hi"),
     show_all: ("show_all", "show", "list"),
     show_notes: ("show_notes", "show_note", "list_notes"),
@@ -519,6 +638,8 @@ COMMANDS = {
     note: ("note", "help_note"),
     find: ("find",),
     sorting: ("sorting", "sort_path"),
+    import_file: ("import", "import_contacts"),
+    export_file: ("export", "export_contacts"),
 }
 
 
@@ -572,14 +693,20 @@ def func_completer(CMD):
         "delete_note",
         "delete_tag",
         "find_name",
+        "fuzzy",
         "birthdays",
         "search",
         "find_any",
+        "query",
+        "who",
         "help",
+        "stats",
         "show",
         "list",
         "show_notes",
         "list_notes",
+        "import",
+        "export",
         "exit",
         "close",
         "sort_path",
@@ -596,26 +723,38 @@ completer = NestedCompleter.from_nested_dict(func_completer(COMMANDS))
 def main():
     global book
     global notes
-    book = book.read_contacts_from_file(FILENAME)
-    notes = notes.read_notes_from_file(NOTE_FILENAME)
+    global saver
+    if STORAGE_BACKEND == "sqlite":
+        # зміни чекають у транзакції SQLite до збереження, журнал не потрібен
+        book = AddressBook.open_sqlite(SQLITE_FILENAME, FILENAME)
+    else:
+        # знімок і журнал читаються під одним блокуванням з іншими процесами
+        with file_lock(FILENAME + JOURNAL_SUFFIX):
+            book = book.read_contacts_from_file(FILENAME).attach_journal(
+                FILENAME + JOURNAL_SUFFIX, JOURNAL_LIMIT
+            )
+    # нотатки читаються з диска лише при першій команді з нотатками
+    notes = LazyNotesBook(NOTE_FILENAME, directory=NOTES_DIR)
+    saver = AutoSaver(AUTOSAVE_DELAY)
+    saver.watch(book, FILENAME)
+    saver.watch(notes, NOTE_FILENAME)
+    saver.start()
     print(say_hello())
     while True:
         user_input = prompt(">>>", completer=completer)
         # user_input = input(f"{BLUE}>>{YELLOW}>>{RESET}")
         func, data = parser(user_input.strip().lower())
-        print(func(*data))
-        if func not in [
-            say_good_bay,
-            show_all,
-            show_notes,
-            say_hello,
-            help_page,
-            search,
-            name_find,
-            get_birthdays_on_date,
-        ]:
-            book.write_contacts_to_file(FILENAME)
-            notes.write_notes_to_file(NOTE_FILENAME)
+        if func in (import_file, export_file):
+            # шлях до файлу - як введено: з регістром і пробілами
+            data = user_input.strip().split(maxsplit=1)[1:]
+        with saver.lock:
+            # зміни, які тим часом записали інші процеси з тими самими файлами
+            book.refresh(FILENAME)
+            notes.refresh(NOTE_FILENAME)
+            print(func(*data))
+        # записується лише змінена книга, і не частіше ніж раз на AUTOSAVE_DELAY
+        if book.dirty or notes.dirty:
+            saver.touch()
 
 
 if __name__ == "__main__":
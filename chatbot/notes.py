@@ -1,9 +1,12 @@
 from collections import UserDict
-from .constants import RED, GRAY, CYAN, MAGENTA, RESET, LEN_OF_NAME_FIELD
-from datetime import datetime
+from .constants import GRAY, CYAN, MAGENTA, RESET, LEN_OF_NAME_FIELD
 import os.path
-import pickle
 from .classes import Field
+from .journal import Journaled, file_lock
+from .paging import Paged
+from .binformat import NOTES_MAGIC, dump_notes, load_notes, loads_legacy
+from .storage import ShardedNoteStore, SortedDict
+from .constants import JOURNAL_SUFFIX, NOTE_SHARDS
 
 
 class NoteError(Exception):
@@ -11,10 +14,13 @@ class NoteError(Exception):
 
 
 class Title(Field):
-    ...
+    __slots__ = ()
 
 
 class Content(Field):
+    __slots__ = ()
+    max_bytes = None  # текст нотатки у файлі - u32
+
     def __init__(self, content):
         super().__init__(content)
 
@@ -26,6 +32,8 @@ class Content(Field):
 
 
 class Tags(Field):
+    __slots__ = ()
+
     def __init__(self, tags=None):
         super().__init__(tags or [])
 
@@ -67,6 +75,15 @@ class Note:
         self.content = Content(content)
         self.tags = Tags(tags) if tags else []
 
+    def to_row(self):
+        tags = [str(t) for t in self.tags]
+        return str(self.title.value), str(self.content.value), tags
+
+    @classmethod
+    def from_row(cls, row):
+        title, content, tags = row
+        return cls(title, content, tags or None)
+
     # def __init__(
     #     self, title: Title, content: Content | None = None, tags: Tags | None = None
     # ) -> None:
@@ -117,19 +134,50 @@ class Note:
     #     return f"{GRAY}•{RESET}{blanks}{CYAN}{self.title}{RESET}  {GRAY}: {RESET}{self.content} \t{MAGENTA}{tags_str}{RESET}"
 
 
-class NotesBook(UserDict):
+class NotesBook(Paged, Journaled, UserDict):
     def __init__(self):
         super().__init__()
+        self.data = SortedDict()  # завжди у порядку заголовків
+
+    def _changed(self, method, title, *args):
+        if title in self.data and hasattr(self.data, "note_changed"):
+            self.data.note_changed(title)
+        self._log("book", method, (title, *args))
+
+    @classmethod
+    def open_sharded(cls, directory, legacy_fn=None):
+        book = cls()
+        store = ShardedNoteStore(directory, Note, NOTE_SHARDS)
+        if not store.exists() and legacy_fn and os.path.exists(legacy_fn):
+            # перший запуск: переносимо нотатки зі старого файлу та його журналу
+            with file_lock(legacy_fn + JOURNAL_SUFFIX):
+                old_book = cls().read_notes_from_file(legacy_fn)
+                old_book.attach_journal(legacy_fn + JOURNAL_SUFFIX)
+            for title, note in old_book.data.items():
+                store[title] = note
+            store.save()
+        book.data = store
+        return book
+
+    def refresh(self, fn):
+        if hasattr(self.data, "refresh"):
+            # шарди: блокування і злиття чужих змін - у самому сховищі
+            if self.data.refresh():
+                self.version += 1
+        else:
+            super().refresh(fn)
 
     def add_note(self, title, content, tags):
         new_note = Note(title, content, tags if tags else None)
         self.data[title] = new_note
+        self._changed("add_note", title, content, tags)
         # self.data[new_note.name.value] = new_note
         return f"Note '{title}' has been successfully added.\n\t{self.data[title]}"
 
     def edit_note(self, title, new_content):
         if title in self.data:
-            self.data[title] = new_content
+            self.data[title].content.edit_content(new_content)
+            self._changed("edit_note", title, new_content)
             return f"Note '{title}' edited.\n\t{self.data[title]}"
         else:
             return f"Note '{title}' not found."
@@ -137,6 +185,7 @@ class NotesBook(UserDict):
     def delete_note(self, title):
         if title in self.data:
             del self.data[title]
+            self._changed("delete_note", title)
             return f"Note '{title}' deleted."
         else:
             return f"Note '{title}' not found."
@@ -144,6 +193,7 @@ class NotesBook(UserDict):
     def add_tags(self, title, tags):  # метод для додавання тегів
         if title in self.data:
             self.data[title].tags.add_tags(tags)
+            self._changed("add_tags", title, tags)
             return f"Tags {', '.join(tags)} added to the note with title '{title}'.\n\t{self.data[title]}"
         else:
             raise NoteError(f"Note with title '{title}' not found.")
@@ -151,6 +201,7 @@ class NotesBook(UserDict):
     def change_tags(self, title, old_tag, new_tag):
         if title in self.data:
             self.data[title].tags.change_tag(old_tag, new_tag)
+            self._changed("change_tags", title, old_tag, new_tag)
             return f"Tag {old_tag} has been successfully changed to {new_tag} for title '{title}'.\n\t{self.data[title]}"
         else:
             raise NoteError(f"Note with title '{title}' not found.")
@@ -158,6 +209,7 @@ class NotesBook(UserDict):
     def delete_tags(self, title, tag):
         if title in self.data:
             self.data[title].tags.delete_tag(tag)
+            self._changed("delete_tags", title, tag)
             return f"Tag {tag} has been successfully deleted for title '{title}'.\n\t{self.data[title]}"
         else:
             raise NoteError(f"Note with title '{title}' not found.")
@@ -224,7 +276,13 @@ class NotesBook(UserDict):
 
     def search_notes_by_tag(self, tag):
         matching_notes = []
-        for title, note in self.data.items():
+        tags_index = getattr(self.data, "tags", None)
+        for title in self.data:
+            if tags_index is not None:
+                # теги з індексу - шард читається лише для знайдених нотаток
+                if tag.lower().strip() not in map(str.lower, tags_index[title]):
+                    continue
+            note = self.data[title]
             if tag.lower().strip() in map(str.lower, note.tags.value):
                 matching_notes.append(
                     f"Note 'Title: {note.title}' Content: {note.content} Tags:{', '.join(map(str, note.tags.value))}"
@@ -245,23 +303,84 @@ class NotesBook(UserDict):
         return result if result else "No matching notes found."
 
     def read_notes_from_file(self, fn):
-        if os.path.exists(fn):
-            with open(fn, "rb") as fh:
-                self = pickle.load(fh)
-            self.data = dict(sorted(self.items()))
+        loaded = self._load_snapshot(fn)
+        if loaded is not None:
+            self = loaded
         print(f"{GRAY}the notes has been successfully restored{RESET}")
         return self
 
     def write_notes_to_file(self, fn):
-        with open(fn, "wb") as fh:
-            pickle.dump(self, fh)
+        if hasattr(self.data, "save"):
+            # шарди пишуться самі, лише змінені
+            self.data.save()
+        else:
+            self._save_snapshot(fn)
         return f"{GRAY}the notes has been saved successfully{RESET}"
 
-    def iterator(self, n=None):
-        counter = 0
-        while counter < len(self):
-            yield list(self.values())[counter : counter + n]
-            counter += n
+    def _snapshot(self, fn):
+        return self.write_notes_to_file(fn)
+
+    def _encode(self):
+        return dump_notes(note.to_row() for note in self.data.values())
+
+    def _decode(self, payload):
+        if not payload.startswith(NOTES_MAGIC):
+            # старий pickle-файл - при наступному збереженні стане новим форматом
+            book = loads_legacy(payload)
+            book.data = SortedDict(book.data)
+            return book
+        book = type(self)()
+        rows = load_notes(payload)
+        book.data = SortedDict((row[0], Note.from_row(row)) for row in rows)
+        return book
+
+
+class LazyNotesBook:
+    # відкриває нотатки лише при першому зверненні до них (першій команді
+    # з нотатками); сесії, що працюють тільки з контактами, файл не читають
+    def __init__(self, fn, directory=None):
+        self.fn = fn
+        self.directory = directory
+        self.book = None
+
+    def load(self) -> NotesBook:
+        if self.book is None and self.directory:
+            self.book = NotesBook.open_sharded(self.directory, self.fn)
+        if self.book is None:
+            self.book = NotesBook().read_notes_from_file(self.fn)
+        return self.book
+
+    @property
+    def dirty(self):
+        return self.book is not None and self.book.dirty
+
+    def save(self, fn):
+        if self.book is not None:
+            return self.book.save(fn)
+
+    def refresh(self, fn):
+        if self.book is not None:
+            self.book.refresh(fn)
+
+    def compact(self, fn):
+        if self.book is None:
+            return f"{GRAY}the notes have not been changed{RESET}"
+        return self.book.compact(fn)
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __len__(self):
+        return len(self.load())
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __contains__(self, title):
+        return title in self.load()
+
+    def __getitem__(self, title):
+        return self.load()[title]
 
     # def __str__(self):
     # tags_str = "".join(t.value for t in self.tags)
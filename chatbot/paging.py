@@ -0,0 +1,49 @@
+import base64
+from itertools import islice
+
+
+LAST_CHAR = "\U0010ffff"  # більший за будь-який символ: межа "усі ключі з префіксом"
+
+
+# курсор - закодований останній ключ попередньої сторінки: сторінки
+# продовжуються з того самого місця, навіть якщо між ними книга змінилася
+def encode_cursor(key: str) -> str:
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    # binascii.Error та UnicodeDecodeError - обидва ValueError
+    return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+
+
+class Paged:
+    # посторінковий перегляд AddressBook і NotesBook у порядку ключів;
+    # сховища книг тримають ключі відсортованими (irange), тож сторінка
+    # знаходиться за O(log n + size) без сортування
+    def page(self, cursor: str | None = None, size: int | None = None):
+        # (записи сторінки - генератор, курсор наступної сторінки або None)
+        after = decode_cursor(cursor) if cursor else None
+        keys = self.data.irange(after, exclude_low=True)
+        if not size:
+            return (self.data[key] for key in keys), None
+        if size < 0:
+            raise ValueError(f"page size must be positive, got {size}")
+        keys = list(islice(keys, size + 1))
+        next_cursor = encode_cursor(keys[size - 1]) if len(keys) > size else None
+        return (self.data[key] for key in keys[:size]), next_cursor
+
+    def pages(self, size: int | None = None, cursor: str | None = None):
+        while True:
+            items, cursor = self.page(cursor, size)
+            yield items
+            if cursor is None:
+                return
+
+    def iterator(self, n=None):
+        for items in self.pages(n):
+            yield list(items)
+
+    def between(self, first: str, last: str):
+        # записи з ключами від first до last, разом з усіма, що починаються з last
+        for key in self.data.irange(first, last + LAST_CHAR):
+            yield self.data[key]
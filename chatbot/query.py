@@ -0,0 +1,271 @@
+from datetime import date
+import re
+
+from .classes import Phone, PhoneError
+from .indexes import (
+    day_key,
+    edit_distance,
+    fuzzy_tolerance,
+    latin_name,
+    next_birthday,
+    search_texts,
+    sound_key,
+)
+
+# =============================================
+#        мова запитів до адресної книги
+# =============================================
+# query phone:067* email:@gmail.com bd:<30d addr:kyiv name:~jon
+#   name:jon     - ім'я містить "jon"          name:~jon - схоже ім'я (з помилками,
+#                                              однакове звучання, інша абетка)
+#   phone:067*   - номер починається з 067     phone:0671234567 - точний номер
+#   email:gmail  - e-mail містить "gmail"      addr:kyiv - адреса містить "kyiv"
+#   email:@ukr.net - адреси домену ukr.net     email:olena* - адреса починається з olena
+#   bd:<30d      - день народження у найближчі 30 днів (bd:today, bd:25-12, bd:1990)
+#   слово без поля - його містить будь-яке поле
+# мають виконуватися всі умови: план бере найменшу множину кандидатів
+# з індексів, решта умов перевіряється лише на цих кандидатах
+
+SMALL_PLAN = 64  # кандидатів достатньо мало - дорожчі індекси не питаємо
+
+
+class QueryError(Exception):
+    ...
+
+
+class Term:
+    index = None  # назва індексу для плану запиту
+    cost = 3  # порядок звернення до індексів: дешевші - раніше
+
+    def candidates(self, book):
+        # множина імен-кандидатів з індексу або None, якщо індексу немає
+        return None
+
+    def match(self, record) -> bool:
+        raise NotImplementedError
+
+
+class TextTerm(Term):
+    index = "trigram"
+
+    def __init__(self, text: str) -> None:
+        self.text = text.lower()
+
+    def candidates(self, book):
+        return book.names_by_text(self.text)
+
+    def match(self, record):
+        return any(self.text in text for text in search_texts(record))
+
+
+class NameTerm(TextTerm):
+    def match(self, record):
+        return self.text in record.name.value.lower()
+
+
+class EmailTerm(TextTerm):
+    def __init__(self, text: str) -> None:
+        super().__init__(text.rstrip("*"))
+        self.prefix = text.endswith("*")
+        self.domain = None
+        if self.text.startswith("@") and not self.prefix:
+            self.domain = self.text[1:]
+        if self.prefix or self.domain:
+            self.index = "email"
+            self.cost = 1
+
+    def candidates(self, book):
+        if self.domain:
+            return set(book.names_by_email_domain(self.domain))
+        if self.prefix:
+            return set(book.names_by_email_prefix(self.text))
+        return super().candidates(book)
+
+    def match_email(self, email) -> bool:
+        if self.domain:
+            domain = email.rpartition("@")[2]
+            return domain == self.domain or domain.endswith("." + self.domain)
+        if self.prefix:
+            return email.startswith(self.text)
+        return self.text in email
+
+    def match(self, record):
+        return any(self.match_email(email.value.lower()) for email in record.emails)
+
+
+class AddressTerm(TextTerm):
+    def match(self, record):
+        return record.address is not None and self.text in record.address.value.lower()
+
+
+class BirthdayTextTerm(TextTerm):
+    def match(self, record):
+        if record.birthday is None:
+            return False
+        return self.text in record.birthday.value.strftime("%d-%m-%Y")
+
+
+class FuzzyNameTerm(Term):
+    index = "fuzzy"
+    cost = 2
+
+    def __init__(self, name: str) -> None:
+        self.word = latin_name(name)
+        self.sound = sound_key(name)
+        self.tolerance = fuzzy_tolerance(self.word)
+
+    def candidates(self, book):
+        names = book.index("fuzzy").within(self.word, self.tolerance)
+        return names | set(book.index("phonetic").sounds_like(self.word))
+
+    def match(self, record):
+        name = record.name.value
+        if edit_distance(latin_name(name), self.word) <= self.tolerance:
+            return True
+        return bool(self.sound) and sound_key(name) == self.sound
+
+
+class PhoneTerm(Term):
+    index = "phone"
+    cost = 0
+
+    def __init__(self, pattern: str) -> None:
+        self.prefix = pattern.endswith("*")
+        self.digits = re.sub(r"\D", "", pattern)
+        if not self.digits:
+            raise QueryError(f"phone:{pattern} - the phone must contain digits")
+        self.value = None  # повний номер - пошук через індекс телефонів
+        if not self.prefix:
+            try:
+                self.value = Phone(pattern).value
+            except PhoneError:
+                pass
+        if self.value is None:
+            self.index = "trigram"
+            self.cost = 3
+
+    def candidates(self, book):
+        if self.value is not None:
+            return {record.name.value for record in book.find_by_phone(self.value)}
+        return book.names_by_text(self.digits)
+
+    def match(self, record):
+        for phone in record.phones:
+            if self.value is not None:
+                if phone.value == self.value:
+                    return True
+                continue
+            # "+380671234567" можна шукати як "380671..." або "067..."
+            for form in (phone.value[1:], "0" + phone.value[4:]):
+                if form.startswith(self.digits) if self.prefix else self.digits in form:
+                    return True
+        return False
+
+
+class UpcomingBirthdayTerm(Term):
+    index = "birthday"
+    cost = 1
+
+    def __init__(self, days: int, today: date | None = None) -> None:
+        self.days = days
+        self.today = today or date.today()
+
+    def candidates(self, book):
+        return set(book.upcoming_names(self.days, self.today))
+
+    def match(self, record):
+        if record.birthday is None:
+            return False
+        birthday = next_birthday(record.birthday.value, self.today)
+        return (birthday - self.today).days <= self.days
+
+
+class BirthdayDayTerm(Term):
+    index = "birthday"
+    cost = 1
+
+    def __init__(self, day: int, month: int) -> None:
+        try:
+            self.key = day_key(date(2000, month, day))  # 2000 - високосний
+        except ValueError:
+            raise QueryError(f"bd:{day:02d}-{month:02d} - incorrect date")
+
+    def candidates(self, book):
+        return set(book.names_by_birthday_days(self.key, self.key))
+
+    def match(self, record):
+        birthday = record.birthday
+        return birthday is not None and day_key(birthday.value) == self.key
+
+
+def _name_term(value):
+    if value.startswith("~"):
+        return FuzzyNameTerm(value[1:])
+    return NameTerm(value)
+
+
+def _birthday_term(value):
+    if value == "today":
+        return UpcomingBirthdayTerm(0)
+    if match := re.fullmatch(r"<(\d+)d?", value):
+        return UpcomingBirthdayTerm(int(match.group(1)))
+    if match := re.fullmatch(r"(\d{1,2})-(\d{1,2})", value):
+        return BirthdayDayTerm(int(match.group(1)), int(match.group(2)))
+    return BirthdayTextTerm(value)
+
+
+FIELDS = {
+    ("name", "n"): _name_term,
+    ("phone", "tel", "p"): PhoneTerm,
+    ("email", "mail", "e"): EmailTerm,
+    ("addr", "address", "a"): AddressTerm,
+    ("bd", "birthday", "b"): _birthday_term,
+}
+
+
+def parse_term(token: str) -> Term:
+    field, sep, value = token.partition(":")
+    if not sep:
+        return TextTerm(token)
+    if not value:
+        raise QueryError(f"'{token}' - the value after ':' is required")
+    for names, make_term in FIELDS.items():
+        if field.lower() in names:
+            return make_term(value)
+    raise QueryError(f"'{field}' - unknown field, use name, phone, email, addr or bd")
+
+
+def parse_query(text: str) -> list:
+    terms = [parse_term(token) for token in text.split()]
+    if not terms:
+        raise QueryError("the query is empty")
+    return terms
+
+
+class Query:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.terms = parse_query(text)
+        self.explain = ""  # план після виконання: індекс і кількість кандидатів
+
+    def plan(self, book):
+        # найменша множина кандидатів; None - індексу немає, перебір усіх записів
+        best = None
+        for term in sorted(self.terms, key=lambda term: term.cost):
+            if best is not None and len(best) <= SMALL_PLAN:
+                break
+            names = term.candidates(book)
+            if names is not None and (best is None or len(names) < len(best)):
+                best = names
+                self.explain = f"{term.index} index, {len(names)} candidates"
+        if best is None:
+            self.explain = f"full scan, {len(book.data)} records"
+        return best
+
+    def run(self, book):
+        # ліниво: записи перевіряються і віддаються по одному, у порядку імен
+        names = self.plan(book)
+        for name in sorted(names) if names is not None else book.data:
+            record = book.data[name]
+            if all(term.match(record) for term in self.terms):
+                yield record
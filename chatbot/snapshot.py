@@ -0,0 +1,93 @@
+import os
+import struct
+import zlib
+
+
+# заголовок знімка: сигнатура, покоління, довжина даних, crc32 даних
+MAGIC = b"K9SN"
+HEADER = struct.Struct("<4sQQI")
+
+
+def snapshot_names(fn, keep):
+    # fn - останній знімок, fn.1 ... fn.<keep-1> - попередні
+    return [fn] + [f"{fn}.{i}" for i in range(1, keep)]
+
+
+def _fsync_dir(fn):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(fn)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _same_data(fn, length, crc) -> bool:
+    # чи містить цілий знімок fn ті самі дані (за довжиною і crc32 заголовка)
+    if not os.path.exists(fn):
+        return False
+    with open(fn, "rb") as fh:
+        header = fh.read(HEADER.size)
+        size = os.fstat(fh.fileno()).st_size
+    if len(header) < HEADER.size:
+        return False
+    magic, _, old_length, old_crc = HEADER.unpack(header)
+    if magic != MAGIC or size != HEADER.size + length:
+        return False
+    return (old_length, old_crc) == (length, crc)
+
+
+def write_snapshot(fn, payload: bytes, generation: int, keep: int):
+    tmp_fn = fn + ".tmp"
+    crc = zlib.crc32(payload)
+    with open(tmp_fn, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, generation, len(payload), crc))
+        fh.write(payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+    if not _same_data(fn, len(payload), crc):
+        # ті самі дані замінюють fn без зсуву копій: історія лишається справжньою
+        names = snapshot_names(fn, keep)
+        for older, newer in zip(reversed(names[1:]), reversed(names[:-1])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+    os.replace(tmp_fn, fn)
+    _fsync_dir(fn)
+
+
+def check_snapshot(fn):
+    # повертає (generation, довжина) або None, якщо файл обірваний/пошкоджений;
+    # розмір перевіряється за заголовком, без читання даних
+    with open(fn, "rb") as fh:
+        header = fh.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        magic, generation, length, _ = HEADER.unpack(header)
+        if magic != MAGIC:
+            return None
+        if os.fstat(fh.fileno()).st_size != HEADER.size + length:
+            return None
+    return generation, length
+
+
+def read_snapshot(fn, keep: int):
+    # (дані, покоління, файл) з останнього цілого знімка або None
+    for name in snapshot_names(fn, keep):
+        if not os.path.exists(name):
+            continue
+        with open(name, "rb") as fh:
+            header = fh.read(HEADER.size)
+            if not header.startswith(MAGIC):
+                # старий файл без заголовка - звичайний pickle
+                if name == fn and header[:1] == b"\x80":
+                    return header + fh.read(), 0, name
+                continue
+        if check_snapshot(name) is None:
+            continue
+        with open(name, "rb") as fh:
+            _, generation, length, crc = HEADER.unpack(fh.read(HEADER.size))
+            payload = fh.read(length)
+        if zlib.crc32(payload) == crc:
+            return payload, generation, name
+    return None
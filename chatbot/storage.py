@@ -0,0 +1,574 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import os.path
+from pathlib import Path
+import sqlite3
+import zlib
+
+from .binformat import (
+    dump_contact,
+    load_contact,
+    dump_notes,
+    load_notes,
+    dump_notes_index,
+    load_notes_index,
+)
+from .indexes import NGRAM, reversed_domain, search_texts
+from .paging import LAST_CHAR
+from .journal import file_lock
+from .snapshot import check_snapshot, read_snapshot, write_snapshot
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    name TEXT PRIMARY KEY,
+    birthday TEXT,
+    address TEXT,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS phones (
+    phone TEXT NOT NULL,
+    name TEXT NOT NULL REFERENCES records(name) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS emails (
+    email TEXT NOT NULL,
+    name TEXT NOT NULL REFERENCES records(name) ON DELETE CASCADE,
+    domain TEXT NOT NULL  -- перевернутий домен: "net.ukr.mail."
+);
+CREATE INDEX IF NOT EXISTS ix_records_birthday_day ON records(substr(birthday, 6));
+CREATE INDEX IF NOT EXISTS ix_phones_phone ON phones(phone);
+CREATE INDEX IF NOT EXISTS ix_phones_name ON phones(name);
+CREATE INDEX IF NOT EXISTS ix_emails_email ON emails(email);
+CREATE INDEX IF NOT EXISTS ix_emails_name ON emails(name);
+CREATE INDEX IF NOT EXISTS ix_emails_lower ON emails(lower(email));
+CREATE INDEX IF NOT EXISTS ix_emails_domain ON emails(domain);
+"""
+# тексти запису для search: LIKE '%...%' по триграмах замість перебору записів
+SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE search_text"
+    " USING fts5(name UNINDEXED, body, tokenize=trigram)"
+)
+
+
+class SortedKeys:
+    # завжди відсортований список ключів: вставка та видалення через bisect,
+    # обхід по порядку і діапазони - без повторного сортування
+    def __init__(self, keys=()) -> None:
+        self.keys = sorted(keys)
+
+    def add(self, key):
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            self.keys.insert(i, key)
+
+    def merge(self, new_keys):
+        # пачка ключів, яких ще немає: одне злиття замість вставок по одному
+        self.keys.extend(new_keys)
+        self.keys.sort()
+
+    def discard(self, key):
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    def irange(self, low=None, high=None, exclude_low=False):
+        # ключі low <= key <= high (key > low, якщо exclude_low)
+        keys = self.keys
+        if low is None:
+            start = 0
+        elif exclude_low:
+            start = bisect_right(keys, low)
+        else:
+            start = bisect_left(keys, low)
+        end = len(keys) if high is None else bisect_right(keys, high)
+        return (keys[i] for i in range(start, end))
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class SortedDict(MutableMapping):
+    # сховище книг у пам'яті: dict + відсортовані ключі
+    def __init__(self, items=()) -> None:
+        self.map = dict(items)
+        self.order = SortedKeys(self.map)
+
+    def __getitem__(self, key):
+        return self.map[key]
+
+    def __setitem__(self, key, value):
+        if key not in self.map:
+            self.order.add(key)
+        self.map[key] = value
+
+    def __delitem__(self, key):
+        del self.map[key]
+        self.order.discard(key)
+
+    def update(self, other=(), /, **kwargs):
+        items = dict(other, **kwargs)
+        new_keys = [key for key in items if key not in self.map]
+        self.map.update(items)
+        self.order.merge(new_keys)
+
+    def irange(self, low=None, high=None, exclude_low=False):
+        return self.order.irange(low, high, exclude_low)
+
+    def __contains__(self, key):
+        return key in self.map
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.map)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class SQLiteStore(MutableMapping):
+    # сховище записів AddressBook у файлі SQLite: ім'я -> Record
+    # записи не тримаються в пам'яті, кожне звернення читає рядок з бази
+    def __init__(self, fn, record_cls) -> None:
+        self.fn = fn
+        self.record_cls = record_cls
+        self.book = None
+        # з'єднанням користується і потік автозбереження (під спільним lock)
+        self.conn = sqlite3.connect(fn, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self.fts = self._search_table()
+
+    def _search_table(self) -> bool:
+        # таблиця пошуку створюється разом з базою; без fts5/trigram (і в базі,
+        # створеній без них) search користується триграмним індексом у пам'яті
+        query = "SELECT 1 FROM sqlite_master WHERE name = 'search_text'"
+        if self.conn.execute(query).fetchone():
+            return True
+        if self.conn.execute("SELECT 1 FROM records LIMIT 1").fetchone():
+            return False
+        try:
+            self.conn.execute(SEARCH_TABLE)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _write_text(self, name, record):
+        self.conn.execute(
+            "INSERT INTO search_text (name, body) VALUES (?, ?)",
+            (name, "\n".join(search_texts(record))),
+        )
+
+    def _write(self, name, record):
+        birthday = (
+            record.birthday.value.strftime("%Y-%m-%d") if record.birthday else None
+        )
+        address = record.address.value if record.address else None
+        self.conn.execute("DELETE FROM phones WHERE name = ?", (name,))
+        self.conn.execute("DELETE FROM emails WHERE name = ?", (name,))
+        if self.fts:
+            self.conn.execute("DELETE FROM search_text WHERE name = ?", (name,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO records (name, birthday, address, data) VALUES (?, ?, ?, ?)",
+            (name, birthday, address, dump_contact(record.to_row())),
+        )
+        self.conn.executemany(
+            "INSERT INTO phones (phone, name) VALUES (?, ?)",
+            [(p.value, name) for p in record.phones],
+        )
+        self.conn.executemany(
+            "INSERT INTO emails (email, name, domain) VALUES (?, ?, ?)",
+            [(e.value, name, _email_domain(e.value)) for e in record.emails],
+        )
+        if self.fts:
+            self._write_text(name, record)
+
+    def __setitem__(self, name, record):
+        # транзакцію завершує save()
+        self._write(name, record)
+
+    def update_many(self, records):
+        # одна транзакція на весь пакет
+        with self.conn:
+            for record in records:
+                self._write(record.name.value, record)
+
+    def record_changed(self, record):
+        self[record.name.value] = record
+
+    def __getitem__(self, name):
+        row = self.conn.execute(
+            "SELECT data FROM records WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        record = self.record_cls.from_row(load_contact(row[0]))
+        record.book = self.book
+        return record
+
+    def __delitem__(self, name):
+        cursor = self.conn.execute("DELETE FROM records WHERE name = ?", (name,))
+        if not cursor.rowcount:
+            raise KeyError(name)
+        if self.fts:
+            self.conn.execute("DELETE FROM search_text WHERE name = ?", (name,))
+
+    def __contains__(self, name):
+        row = self.conn.execute(
+            "SELECT 1 FROM records WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        # курсор читає імена поступово, без завантаження всієї таблиці
+        for (name,) in self.conn.execute("SELECT name FROM records ORDER BY name"):
+            yield name
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def irange(self, low=None, high=None, exclude_low=False):
+        # діапазон імен по індексу первинного ключа
+        conditions, params = [], []
+        if low is not None:
+            conditions.append("name > ?" if exclude_low else "name >= ?")
+            params.append(low)
+        if high is not None:
+            conditions.append("name <= ?")
+            params.append(high)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT name FROM records{where} ORDER BY name"
+        for (name,) in self.conn.execute(query, params):
+            yield name
+
+    def names_by_phone(self, phone):
+        rows = self.conn.execute(
+            "SELECT DISTINCT name FROM phones WHERE phone = ? ORDER BY name", (phone,)
+        )
+        return [name for (name,) in rows]
+
+    def names_by_email_prefix(self, prefix):
+        prefix = prefix.lower()
+        rows = self.conn.execute(
+            "SELECT DISTINCT name FROM emails"
+            " WHERE lower(email) BETWEEN ? AND ? ORDER BY name",
+            (prefix, prefix + LAST_CHAR),
+        )
+        return [name for (name,) in rows]
+
+    def names_by_email_domain(self, domain):
+        key = reversed_domain(domain.lower().lstrip("@"))
+        rows = self.conn.execute(
+            "SELECT DISTINCT name FROM emails"
+            " WHERE domain BETWEEN ? AND ? ORDER BY name",
+            (key, key + LAST_CHAR),
+        )
+        return [name for (name,) in rows]
+
+    def names_by_birthday_days(self, low, high):
+        # день народження - "MM-DD" з дати "YYYY-MM-DD" (індекс по виразу),
+        # low і high - ключі mmdd, як у BirthdayIndex
+        rows = self.conn.execute(
+            "SELECT name FROM records WHERE substr(birthday, 6) BETWEEN ? AND ?"
+            " ORDER BY substr(birthday, 6), name",
+            (_month_day(low), _month_day(high)),
+        )
+        return [name for (name,) in rows]
+
+    def names_by_text(self, text):
+        # кандидати для search: text у нижньому регістрі, не коротший за NGRAM;
+        # з ESCAPE fts5 не користується триграмами, тож "%" і "_" - без індексу
+        if not self.fts or len(text) < NGRAM or "%" in text or "_" in text:
+            return None
+        rows = self.conn.execute(
+            "SELECT DISTINCT name FROM search_text WHERE body LIKE ?", (f"%{text}%",)
+        )
+        return {name for (name,) in rows}
+
+    def save(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _email_domain(email) -> str:
+    return reversed_domain(email.lower().rpartition("@")[2])
+
+
+def _month_day(key) -> str:
+    # 229 -> "02-29"
+    return f"{key // 100:02d}-{key % 100:02d}"
+
+
+class LazyRecordStore(MutableMapping):
+    # записи AddressBook у вигляді байтів з файлу (формат версії 2);
+    # Record створюється лише при зверненні, розібрані записи - в LRU-кеші
+    def __init__(self, payload: bytes, index: dict, record_cls, cache_size: int):
+        self.payload = payload
+        self.index = index  # ім'я -> (початок, кінець) у payload або None
+        self.record_cls = record_cls
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.changed = {}  # нові та змінені записи, не витісняються до rebase()
+        self.order = SortedKeys(index)  # у файлі імена вже відсортовані
+        self.book = None
+
+    def raw(self, name):
+        # закодований запис без розбору, якщо він не змінювався
+        span = self.index[name]
+        if span is None:
+            return None
+        return self.payload[span[0] : span[1]]
+
+    def __getitem__(self, name):
+        record = self.changed.get(name)
+        if record is not None:
+            return record
+        record = self.cache.get(name)
+        if record is not None:
+            self.cache.move_to_end(name)
+            return record
+        start, end = self.index[name]
+        record = self.record_cls.from_row(load_contact(self.payload[start:end]))
+        record.book = self.book
+        self.cache[name] = record
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return record
+
+    def __setitem__(self, name, record):
+        if name not in self.index:
+            self.order.add(name)
+        self.index[name] = None
+        self.changed[name] = record
+        self.cache.pop(name, None)
+
+    def update(self, other=(), /, **kwargs):
+        # як SortedDict.update: одне злиття ключів на всю пачку
+        items = dict(other, **kwargs)
+        self.order.merge([name for name in items if name not in self.index])
+        for name, record in items.items():
+            self.index[name] = None
+            self.changed[name] = record
+            self.cache.pop(name, None)
+
+    def record_changed(self, record):
+        self[record.name.value] = record
+
+    def rebase(self, payload: bytes, index: dict):
+        # після збереження знімка: усі записи вже є у новому payload, тож
+        # змінені переходять до звичайного LRU-кешу і можуть бути витіснені
+        self.payload = payload
+        self.index = index
+        self.cache.update(self.changed)
+        self.changed = {}
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def __delitem__(self, name):
+        del self.index[name]
+        self.order.discard(name)
+        self.changed.pop(name, None)
+        self.cache.pop(name, None)
+
+    def irange(self, low=None, high=None, exclude_low=False):
+        return self.order.irange(low, high, exclude_low)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.index)
+
+
+class ShardedNoteStore(MutableMapping):
+    # нотатки у каталозі: shard_NN.bin за хешем заголовка + index.bin
+    # (заголовок -> шард, теги); зміна нотатки переписує лише її шард,
+    # а перелік заголовків і тегів береться з індексу без читання шардів.
+    # Кілька процесів: save() і refresh() - під file_lock індексу; покоління
+    # у заголовках index.bin і шардів показують, що змінив інший процес
+    INDEX = "index.bin"
+
+    def __init__(self, directory, note_cls, shards: int):
+        self.directory = Path(directory)
+        self.note_cls = note_cls
+        self.shards = shards
+        self.index = {}  # заголовок -> номер шарда
+        self.tags = {}  # заголовок -> теги
+        self.generation = 0  # покоління прочитаного index.bin
+        self.loaded = {}  # номер шарда -> {заголовок: Note}
+        self.shard_generation = {}  # номер шарда -> покоління прочитаного файлу
+        self.changed = set()  # заголовки, додані чи змінені до save()
+        self.deleted = {}  # номер шарда -> {заголовок: Note}, видалені до save()
+        self.dirty_shards = set()
+        self.index_dirty = False  # змінився перелік заголовків або теги
+        self._read_index()
+
+    def exists(self):
+        return (self.directory / self.INDEX).exists()
+
+    def _index_fn(self):
+        return str(self.directory / self.INDEX)
+
+    def _lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return file_lock(self._index_fn())
+
+    def _read_index(self):
+        self.index, self.tags = {}, {}
+        snapshot = read_snapshot(self._index_fn(), 1)
+        self.generation = snapshot[1] if snapshot is not None else 0
+        if snapshot is not None:
+            for title, shard, tags in load_notes_index(snapshot[0]):
+                self.index[title] = shard
+                self.tags[title] = tags
+        self.order = SortedKeys(self.index)
+
+    def shard_of(self, title):
+        # crc32, а не hash(): номер шарда має бути однаковим між запусками
+        return zlib.crc32(title.encode()) % self.shards
+
+    def _shard_fn(self, shard):
+        return str(self.directory / f"shard_{shard:03d}.bin")
+
+    def _read_shard(self, shard):
+        notes = {}
+        snapshot = read_snapshot(self._shard_fn(shard), 1)
+        self.shard_generation[shard] = snapshot[1] if snapshot is not None else 0
+        if snapshot is not None:
+            for row in load_notes(snapshot[0]):
+                # нотатки, яких немає в індексі (збій посеред save), пропускаємо
+                if self.index.get(row[0]) == shard:
+                    notes[row[0]] = self.note_cls.from_row(row)
+        return notes
+
+    def _shard(self, shard):
+        notes = self.loaded.get(shard)
+        if notes is None:
+            notes = self.loaded[shard] = self._read_shard(shard)
+        return notes
+
+    def __getitem__(self, title):
+        return self._shard(self.index[title])[title]
+
+    def __setitem__(self, title, note):
+        shard = self.shard_of(title)
+        self._shard(shard)[title] = note
+        self.deleted.get(shard, {}).pop(title, None)
+        if title not in self.index:
+            self.order.add(title)
+            self.index_dirty = True
+        self.index[title] = shard
+        self.note_changed(title)
+
+    def __delitem__(self, title):
+        # шард читається до видалення з індексу: _read_shard бере лише
+        # нотатки, що є в індексі
+        note = self._shard(self.index[title]).pop(title)
+        shard = self.index.pop(title)
+        self.order.discard(title)
+        self.tags.pop(title, None)
+        self.changed.discard(title)
+        self.deleted.setdefault(shard, {})[title] = note
+        self.dirty_shards.add(shard)
+        self.index_dirty = True
+
+    def note_changed(self, title):
+        shard = self.index[title]
+        tags = [str(t) for t in self._shard(shard)[title].tags]
+        if self.tags.get(title) != tags:
+            # індекс переписується лише тоді, коли в ньому є що змінити
+            self.tags[title] = tags
+            self.index_dirty = True
+        self.changed.add(title)
+        self.dirty_shards.add(shard)
+
+    def irange(self, low=None, high=None, exclude_low=False):
+        return self.order.irange(low, high, exclude_low)
+
+    def __contains__(self, title):
+        return title in self.index
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.index)
+
+    def _sync(self) -> bool:
+        # (під file_lock) зміни інших процесів: новий індекс і перезаписані
+        # шарди; наші ще не збережені зміни лишаються поверх них
+        reread = False
+        if self.exists():
+            checked = check_snapshot(self._index_fn())
+            reread = checked is not None and checked[0] != self.generation
+        if reread:
+            index, tags = self.index, self.tags
+            deleted = {title for notes in self.deleted.values() for title in notes}
+            self._read_index()
+            for title in deleted:
+                self.index.pop(title, None)
+                self.tags.pop(title, None)
+            for title in self.changed:
+                self.index[title] = index[title]
+                self.tags[title] = tags[title]
+            self.order = SortedKeys(self.index)
+        changed = reread
+        for shard in list(self.loaded):
+            fn = self._shard_fn(shard)
+            checked = check_snapshot(fn) if os.path.exists(fn) else None
+            generation = checked[0] if checked is not None else 0
+            if reread or generation != self.shard_generation[shard]:
+                notes = self._read_shard(shard)
+                for title, note in self.loaded[shard].items():
+                    if title in self.changed:
+                        notes[title] = note
+                self.loaded[shard] = notes
+                changed = True
+        return changed
+
+    def refresh(self) -> bool:
+        with self._lock():
+            return self._sync()
+
+    def _write_shard(self, shard, notes):
+        payload = dump_notes(note.to_row() for note in notes)
+        generation = self.shard_generation.get(shard, 0) + 1
+        write_snapshot(self._shard_fn(shard), payload, generation, 1)
+        self.shard_generation[shard] = generation
+
+    def save(self):
+        # індекс посилається лише на нотатки, які вже є у шардах: спершу
+        # шарди з новими нотатками (видалені ще лишаються), потім індекс,
+        # і лише тоді видалені зникають з шардів - збій посередині не лишає
+        # в індексі заголовків без нотаток
+        if not (self.dirty_shards or self.index_dirty) and self.exists():
+            return
+        with self._lock():
+            self._sync()
+            for shard in sorted(self.dirty_shards):
+                notes = {**self.deleted.get(shard, {}), **self._shard(shard)}
+                self._write_shard(shard, notes.values())
+            if self.index_dirty or not self.exists():
+                rows = (
+                    (title, shard, self.tags.get(title, []))
+                    for title, shard in self.index.items()
+                )
+                self.generation += 1
+                payload = dump_notes_index(rows)
+                write_snapshot(self._index_fn(), payload, self.generation, 1)
+            for shard in sorted(self.deleted):
+                self._write_shard(shard, self._shard(shard).values())
+        self.changed = set()
+        self.dirty_shards = set()
+        self.deleted = {}
+        self.index_dirty = False
@@ -0,0 +1,242 @@
+import csv
+import re
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from .classes import (
+    Record,
+    Phone,
+    Email,
+    BirthDay,
+    BDayError,
+    FieldError,
+)
+from .binformat import MAX_ITEMS
+from .constants import RED, GRAY, RESET, IMPORT_BATCH, IMPORT_ERRORS_SHOWN
+from .constants import LEN_OF_NAME_FIELD
+
+# =============================================
+#    import / export контактів (CSV, vCard)
+# =============================================
+# файли обробляються потоково: рядок за рядком, пачками по IMPORT_BATCH,
+# тож ні файл, ні весь список контактів у пам'яті не збираються
+
+CSV_FIELDS = ["name", "phones", "emails", "birthday", "address"]
+LIST_SEPARATOR = "; "
+VCARD_EXT = (".vcf", ".vcard")
+VCARD_PARTS = re.compile(r"(?<!\\);")
+
+
+def batched(iterable, size):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _split(value):
+    return [v.strip() for v in (value or "").split(";") if v.strip()]
+
+
+def _birthday(value):
+    # BirthDay приймає "dd-mm-YYYY"; у файлах буває і ISO
+    value = value.strip()
+    for fmt in ("%d-%m-%Y", "%Y-%m-%d", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%d-%m-%Y")
+        except ValueError:
+            continue
+    raise BDayError(f"{value} - incorrect date")
+
+
+# ---------- читання ----------
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            yield {
+                "name": (row.get("name") or "").strip(),
+                "phones": _split(row.get("phones")),
+                "emails": _split(row.get("emails")),
+                "birthday": (row.get("birthday") or "").strip(),
+                "address": (row.get("address") or "").strip(),
+            }
+
+
+def _vcard_unescape(value):
+    return value.replace("\\n", " ").replace("\\,", ",").replace("\\;", ";")
+
+
+def _vcard_lines(fh):
+    # розгортання перенесених рядків (продовження починається з пробілу)
+    line = None
+    for raw in fh:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and line is not None:
+            line += raw[1:]
+            continue
+        if line is not None:
+            yield line
+        line = raw
+    if line is not None:
+        yield line
+
+
+def read_vcard(path):
+    with open(path, encoding="utf-8") as fh:
+        card = None
+        for line in _vcard_lines(fh):
+            key, _, value = line.partition(":")
+            key = key.split(";")[0].upper()
+            if key == "BEGIN":
+                card = dict(name="", phones=[], emails=[], birthday="", address="")
+            elif card is None:
+                continue
+            elif key == "END":
+                yield card
+                card = None
+            elif key == "FN":
+                card["name"] = _vcard_unescape(value).strip()
+            elif key == "N" and not card["name"]:
+                parts = [p for p in value.split(";")[:2] if p]
+                card["name"] = " ".join(reversed(parts))
+            elif key == "TEL":
+                card["phones"].append(value.strip())
+            elif key == "EMAIL":
+                card["emails"].append(value.strip())
+            elif key == "BDAY":
+                card["birthday"] = value.strip()
+            elif key == "ADR":
+                # "\;" - крапка з комою всередині частини адреси, не роздільник
+                parts = [_vcard_unescape(p).strip() for p in VCARD_PARTS.split(value)]
+                card["address"] = ", ".join(p for p in parts if p)
+
+
+# ---------- перевірка ----------
+class Problems:
+    # помилки імпорту: рахуються всі, а зберігаються лише перші повідомлення -
+    # великий файл з помилками не займає пам'ять
+    def __init__(self, shown=IMPORT_ERRORS_SHOWN) -> None:
+        self.count = 0
+        self.shown = shown
+        self.messages = []
+
+    def append(self, message):
+        self.count += 1
+        if len(self.messages) < self.shown:
+            self.messages.append(message)
+
+
+def build_records(rows, errors):
+    # dict-рядки -> Record; некоректні значення пропускаються з повідомленням
+    for row in rows:
+        if not row["name"]:
+            errors.append("contact without a name skipped")
+            continue
+        try:
+            record = Record(row["name"])
+        except FieldError:
+            name = row["name"][:LEN_OF_NAME_FIELD]
+            errors.append(f"{name}... - the name is too long, contact skipped")
+            continue
+        phones, bad = Phone.normalize_many(row["phones"])
+        for phone, _ in bad:
+            errors.append(f"{record.name}: {phone} - incorrect phone number")
+        phones = list(dict.fromkeys(phones))
+        if len(phones) > MAX_ITEMS:
+            errors.append(f"{record.name}: only the first {MAX_ITEMS} phones are kept")
+        record.phones.extend(Phone.restore(value) for value in phones[:MAX_ITEMS])
+        emails, bad = Email.validate_many(row["emails"])
+        for email, _ in bad:
+            errors.append(f"{record.name}: {email} - invalid email")
+        emails = list(dict.fromkeys(emails))
+        if len(emails) > MAX_ITEMS:
+            errors.append(f"{record.name}: only the first {MAX_ITEMS} e-mails are kept")
+        record.emails.extend(Email.restore(value) for value in emails[:MAX_ITEMS])
+        if row["birthday"]:
+            try:
+                record.birthday = BirthDay(_birthday(row["birthday"]))
+            except (BDayError, ValueError):
+                errors.append(f"{record.name}: {row['birthday']} - incorrect date")
+        if row["address"]:
+            try:
+                record.add_address(row["address"])
+            except FieldError:
+                errors.append(f"{record.name}: the address is too long")
+        yield record
+
+
+def import_contacts(book, path):
+    path = Path(path).expanduser()
+    if not path.is_file():
+        return f"{RED}file {path} does not exist{RESET}"
+    reader = read_vcard if path.suffix.lower() in VCARD_EXT else read_csv
+    errors = Problems()
+    imported = 0
+    for batch in batched(build_records(reader(path), errors), IMPORT_BATCH):
+        new = {}
+        for record in batch:
+            name = record.name.value
+            if name in book or name in new:
+                errors.append(f"{record.name}: contact already exists, skipped")
+                continue
+            new[name] = record
+        book.add_records(list(new.values()))
+        imported += len(new)
+    result = f"{imported} contacts have been imported from {path}"
+    if errors.count:
+        shown = "\n\t".join(errors.messages)
+        if errors.count > len(errors.messages):
+            shown += f"\n\t... and {errors.count - len(errors.messages)} more"
+        result += f"\n{RED}{errors.count} problems:{RESET}\n\t{GRAY}{shown}{RESET}"
+    return result
+
+
+# ---------- запис ----------
+def _rows(book):
+    for name in book:
+        # по одному запису: ліниве сховище не розбирає всю книгу разом
+        record = book.data[name]
+        birthday = record.birthday.value.strftime("%d-%m-%Y") if record.birthday else ""
+        yield {
+            "name": record.name.value,
+            "phones": LIST_SEPARATOR.join(p.value for p in record.phones),
+            "emails": LIST_SEPARATOR.join(e.value for e in record.emails),
+            "birthday": birthday,
+            "address": record.address.value if record.address else "",
+        }
+
+
+def _vcard_escape(value):
+    return value.replace(",", "\\,").replace(";", "\\;")
+
+
+def write_vcard(fh, record):
+    fh.write("BEGIN:VCARD\r\nVERSION:3.0\r\n")
+    fh.write(f"FN:{_vcard_escape(record.name.value)}\r\n")
+    for phone in record.phones:
+        fh.write(f"TEL;TYPE=CELL:{phone.value}\r\n")
+    for email in record.emails:
+        fh.write(f"EMAIL:{email.value}\r\n")
+    if record.birthday:
+        fh.write(f"BDAY:{record.birthday.value.strftime('%Y-%m-%d')}\r\n")
+    if record.address:
+        fh.write(f"ADR;TYPE=HOME:;;{_vcard_escape(record.address.value)};;;;\r\n")
+    fh.write("END:VCARD\r\n")
+
+
+def export_contacts(book, path):
+    path = Path(path).expanduser()
+    count = 0
+    if path.suffix.lower() in VCARD_EXT:
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            for name in book:
+                write_vcard(fh, book.data[name])
+                count += 1
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for row in _rows(book):
+                writer.writerow(row)
+                count += 1
+    return f"{count} contacts have been exported to {path}"
@@ -0,0 +1,80 @@
+import re
+
+from .binformat import PHONE_PREFIX
+
+# =============================================
+#     перевірка і нормалізація значень полів
+# =============================================
+# таблиці та шаблони будуються один раз при імпорті модуля;
+# функції не кидають винятків - некоректне значення дає None
+
+PHONE_SEPARATORS = b"+( )-."  # bytes.translate видаляє їх швидше за str.replace
+PHONE_DIGITS = 9  # значущі цифри номера після +380
+
+
+def _phone(digits: bytes) -> str | None:
+    if len(digits) >= PHONE_DIGITS and digits.isdigit():
+        return PHONE_PREFIX + digits[-PHONE_DIGITS:].decode()
+    return None
+
+
+def normalize_phone(phone) -> str | None:
+    # "+38 (067) 123-45-67" -> "+380671234567"
+    return _phone(str(phone).strip().encode().translate(None, PHONE_SEPARATORS))
+
+
+def normalize_phones(phones) -> list:
+    # [(номер, нормалізований номер або None)] для всієї пачки: роздільники
+    # видаляються одним translate на весь текст, а не з кожного номера окремо
+    phones = list(phones)
+    items = [str(phone).strip() for phone in phones]
+    text = "\n".join(items).encode().translate(None, PHONE_SEPARATORS)
+    lines = text.split(b"\n")
+    if len(lines) != len(items):
+        # "\n" всередині номера (або порожня пачка) - поштучно
+        lines = [item.encode().translate(None, PHONE_SEPARATORS) for item in items]
+    return [(phone, _phone(digits)) for phone, digits in zip(phones, lines)]
+
+
+# ---------- e-mail ----------
+# локальна частина - слова з [A-Za-z0-9_%+-] через крапку (без ".." і крапки
+# на краях), домен - мітки з літер, цифр і "-" через крапку, зона - літери
+# або punycode ("xn--j1amh" - .укр)
+EMAIL = (
+    r"[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?\.)+"
+    r"(?:[A-Za-z]{2,}|xn--[A-Za-z0-9-]*[A-Za-z0-9])"
+)
+EMAIL_PATTERN = re.compile(EMAIL)
+EMAIL_MAX_LENGTH = 254  # RFC 5321
+# у тексті адреса не може починатися чи закінчуватися посеред слова
+EMAIL_IN_TEXT = re.compile(rf"(?<![A-Za-z0-9._%+-]){EMAIL}(?![A-Za-z0-9-])")
+
+
+def normalize_email(email) -> str | None:
+    email = str(email).strip()
+    if len(email) <= EMAIL_MAX_LENGTH and EMAIL_PATTERN.fullmatch(email):
+        return email
+    return None
+
+
+def normalize_emails(emails) -> list:
+    # [(адреса, перевірена адреса або None)]
+    fullmatch = EMAIL_PATTERN.fullmatch
+    result = []
+    for email in emails:
+        value = str(email).strip()
+        if len(value) > EMAIL_MAX_LENGTH or not fullmatch(value):
+            value = None
+        result.append((email, value))
+    return result
+
+
+def extract_emails(lines):
+    # адреси з тексту по рядках: файл чи нотатки не читаються в пам'ять цілком
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    finditer = EMAIL_IN_TEXT.finditer
+    for line in lines:
+        for match in finditer(line):
+            yield match.group()
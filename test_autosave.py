@@ -0,0 +1,66 @@
+import os
+import time
+
+from chatbot.autosave import AutoSaver
+from chatbot.classes import AddressBook, Record
+from chatbot.journal import UNCHANGED, file_lock
+
+# =============================================
+#     позначка змін і фонове збереження
+# =============================================
+# python -m pytest test_autosave.py
+
+
+def open_book(fn):
+    journal_fn = fn + ".journal"
+    with file_lock(journal_fn):
+        return AddressBook().read_contacts_from_file(fn).attach_journal(journal_fn)
+
+
+def test_unchanged_session_writes_nothing(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    book = AddressBook()
+    book.add_record(Record("Tom"))
+    book.write_contacts_to_file(fn)
+    mtime = os.stat(fn).st_mtime_ns
+
+    book = open_book(fn)
+    assert not book.dirty
+    assert book.compact(fn) == UNCHANGED
+    assert os.stat(fn).st_mtime_ns == mtime
+    assert not os.path.exists(fn + ".1")
+
+    book.data["Tom"].add_phone("0671234567")
+    assert book.dirty
+    assert book.compact(fn) != UNCHANGED
+    assert not book.dirty
+    assert os.path.exists(fn + ".1")
+
+
+def test_autosaver_saves_series_once(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    AddressBook().write_contacts_to_file(fn)
+    book = open_book(fn)
+    saves = []
+    save = book.save
+
+    def counted_save(fn):
+        saves.append(fn)
+        return save(fn)
+
+    book.save = counted_save
+
+    saver = AutoSaver(0.05)
+    saver.watch(book, fn)
+    saver.start()
+    for name in ["Tom", "Ann", "Bob"]:
+        with saver.lock:
+            book.add_record(Record(name))
+        saver.touch()
+    time.sleep(0.3)
+    # серія змін - одне збереження; чиста книга не зберігається
+    assert saves == [fn]
+    assert not book.dirty
+    saver.stop()
+    assert saves == [fn]
+    assert list(open_book(fn).data) == ["Ann", "Bob", "Tom"]
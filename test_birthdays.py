@@ -0,0 +1,96 @@
+from datetime import date
+
+from chatbot.classes import AddressBook, Record
+from chatbot.indexes import birthday_windows, next_birthday
+
+# =============================================
+#     найближчі дні народження
+# =============================================
+# python -m pytest test_birthdays.py
+
+
+def make_book():
+    book = AddressBook()
+    for name, birthday in [
+        ("Leap", "29-02-2000"),
+        ("March", "01-03-1990"),
+        ("Feb", "28-02-1985"),
+        ("Eve", "31-12-1999"),
+        ("Newyear", "01-01-2001"),
+        ("Jan", "05-01-1970"),
+        ("Summer", "15-07-1980"),
+        ("Nobody", None),
+    ]:
+        book.add_record(Record(name, birthday=birthday))
+    return book
+
+
+def names(records):
+    return [record.name.value for record in records]
+
+
+def test_feb_29_in_common_year():
+    born = date(2000, 2, 29)
+    assert next_birthday(born, date(2025, 2, 28)) == date(2025, 3, 1)
+    assert next_birthday(born, date(2028, 2, 28)) == date(2028, 2, 29)
+    book = make_book()
+    # у невисокосний рік 29 лютого святкують 1 березня
+    assert names(book.birthdays_within(0, date(2025, 3, 1))) == ["Leap", "March"]
+    assert names(book.birthdays_within(1, date(2025, 2, 27))) == ["Feb"]
+    assert names(book.birthdays_within(2, date(2025, 2, 27))) == [
+        "Feb",
+        "Leap",
+        "March",
+    ]
+
+
+def test_feb_29_in_leap_year():
+    book = make_book()
+    assert names(book.birthdays_within(0, date(2028, 2, 29))) == ["Leap"]
+    assert names(book.birthdays_within(0, date(2028, 3, 1))) == ["March"]
+
+
+def test_new_year_window():
+    assert birthday_windows(date(2025, 12, 30), 10) == [(1230, 1231), (101, 109)]
+    book = make_book()
+    # грудень іде перед січнем
+    assert names(book.birthdays_within(10, date(2025, 12, 30))) == [
+        "Eve",
+        "Newyear",
+        "Jan",
+    ]
+    assert names(book.birthdays_within(0, date(2026, 1, 1))) == ["Newyear"]
+
+
+def test_whole_year_window():
+    book = make_book()
+    found = names(book.birthdays_within(365, date(2025, 7, 16)))
+    assert found[0] == "Eve" and found[-1] == "Summer"
+    assert len(found) == 7
+
+
+def test_index_follows_changes():
+    book = make_book()
+    today = date(2025, 7, 10)
+    assert names(book.birthdays_within(10, today)) == ["Summer"]
+    book.data["Nobody"].add_birthday("12-07-1995")
+    book.data["Summer"].add_birthday("25-07-1980")
+    book.add_record(Record("Next", birthday="20-07-2000"))
+    book.delete_record("Leap")
+    assert names(book.birthdays_within(10, today)) == ["Nobody", "Next"]
+    assert names(book.birthdays_within(0, date(2025, 3, 1))) == ["March"]
+
+
+def test_sqlite_store_matches_memory(tmp_path):
+    memory = make_book()
+    book = AddressBook.open_sqlite(str(tmp_path / "addressbook.db"))
+    book.add_records([memory.data[name] for name in memory.data])
+    for today, days in [
+        (date(2025, 3, 1), 0),
+        (date(2025, 2, 27), 2),
+        (date(2025, 12, 30), 10),
+        (date(2025, 7, 16), 365),
+    ]:
+        expected = names(memory.birthdays_within(days, today))
+        assert names(book.birthdays_within(days, today)) == expected
+    book.data.close()
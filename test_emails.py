@@ -0,0 +1,52 @@
+from chatbot.classes import AddressBook, Record
+
+# =============================================
+#     e-mail: пошук за доменом і початком адреси
+# =============================================
+# python -m pytest test_emails.py
+
+
+def make_book():
+    book = AddressBook()
+    for name, emails in [
+        ("Tom", ["tom@gmail.com", "Tom.Work@Mail.Ukr.Net"]),
+        ("Ann", ["ann@ukr.net"]),
+        ("Bob", ["bob@notukr.net", "bob@ukr.net.ua"]),
+        ("Eve", []),
+    ]:
+        record = Record(name)
+        for email in emails:
+            record.add_email(email)
+        book.add_record(record)
+    return book
+
+
+def names(records):
+    return [record.name.value for record in records]
+
+
+def test_domain_with_subdomains():
+    book = make_book()
+    assert names(book.find_by_email_domain("ukr.net")) == ["Ann", "Tom"]
+    assert names(book.find_by_email_domain("@UKR.NET")) == ["Ann", "Tom"]
+    assert names(book.find_by_email_domain("mail.ukr.net")) == ["Tom"]
+    assert names(book.find_by_email_domain("net")) == ["Ann", "Bob", "Tom"]
+    assert not book.find_by_email_domain("kr.net")
+
+
+def test_prefix():
+    book = make_book()
+    assert names(book.find_by_email_prefix("TOM")) == ["Tom"]
+    assert names(book.find_by_email_prefix("b")) == ["Bob"]
+    assert not book.find_by_email_prefix("x")
+
+
+def test_index_follows_changes():
+    book = make_book()
+    assert names(book.find_by_email_domain("gmail.com")) == ["Tom"]
+    book.data["Tom"].edit_email("tom@gmail.com", "tom@i.ua")
+    book.data["Ann"].remove_email("ann@ukr.net")
+    book.data["Eve"].add_email("eve@gmail.com")
+    assert names(book.find_by_email_domain("gmail.com")) == ["Eve"]
+    assert names(book.find_by_email_domain("ukr.net")) == ["Tom"]
+    assert names(book.find_by_email_prefix("tom@")) == ["Tom"]
@@ -0,0 +1,101 @@
+import pickle
+
+from chatbot.binformat import (
+    MAX_ITEMS,
+    MAX_STR_BYTES,
+    contacts_index,
+    dump_contact,
+    dump_contacts,
+    dump_notes,
+    load_contacts,
+    load_notes,
+)
+from chatbot.classes import AddressBook, FieldError, Record
+from chatbot.notes import NotesBook
+
+# =============================================
+#     двійковий формат книг замість pickle
+# =============================================
+# python -m pytest test_format.py
+
+
+def make_book(names):
+    book = AddressBook()
+    for i, name in enumerate(names):
+        record = Record(name, f"067{i:07d}", birthday=f"{i % 28 + 1:02d}-03-1990")
+        record.add_email(f"user{i}@mail.ukr.net")
+        record.add_address(f"Kyiv, {name} street {i}")
+        book.add_record(record)
+    return book
+
+
+def rows(book):
+    return [book.data[name].to_row() for name in book.data]
+
+
+def test_contacts_round_trip():
+    book = make_book(["Tom", "Ann", "Олена", "Bob"])
+    book.add_record(Record("Empty"))
+    payload = dump_contacts(
+        (name, dump_contact(book.data[name].to_row())) for name in book.data
+    )
+    assert list(contacts_index(payload)) == ["Ann", "Bob", "Empty", "Tom", "Олена"]
+    assert list(load_contacts(payload)) == rows(book)
+
+
+def test_notes_round_trip():
+    notes = [("title", "text\nз новим рядком", ["tag", "тег"]), ("empty", "", [])]
+    assert list(load_notes(dump_notes(notes))) == notes
+
+
+def test_notes_file_round_trip(tmp_path):
+    fn = str(tmp_path / "notes.bin")
+    notes = NotesBook()
+    notes.add_note("plan", "buy milk", ["home"])
+    notes.add_note("ідея", "", [])
+    notes.write_notes_to_file(fn)
+    with open(fn, "rb") as fh:
+        assert fh.read(1) != b"\x80"
+    loaded = NotesBook().read_notes_from_file(fn)
+    assert [note.to_row() for note in loaded.data.values()] == [
+        note.to_row() for note in notes.data.values()
+    ]
+
+
+def test_format_limits():
+    record = Record("Tom")
+    try:
+        record.add_address("x" * (MAX_STR_BYTES + 1))
+    except FieldError:
+        pass
+    else:
+        raise AssertionError("too long address was accepted")
+    for i in range(MAX_ITEMS + 1):
+        record.add_phone(f"067{i:07d}")
+    assert len(record.phones) == MAX_ITEMS
+    dump_contact(record.to_row())
+
+
+def test_legacy_pickle_migration(tmp_path):
+    # старий файл - pickle книги з модуля верхнього рівня classes
+    import classes
+
+    old_book = classes.AddressBook()
+    old_book.add_record(classes.Record("tom", "0995648525", birthday="18-11-1986"))
+    old_book.add_record(classes.Record("ann"))
+    fn = str(tmp_path / "addressbook.bin")
+    with open(fn, "wb") as fh:
+        pickle.dump(old_book, fh)
+
+    book = AddressBook().read_contacts_from_file(fn)
+    assert list(book.data) == ["Ann", "Tom"]
+    tom = book.data["Tom"]
+    assert tom.phones[0].value == "+380995648525"
+    assert tom.birthday.value.strftime("%d-%m-%Y") == "18-11-1986"
+
+    # при наступному збереженні - новий формат
+    book.write_contacts_to_file(fn)
+    with open(fn, "rb") as fh:
+        assert fh.read(1) != b"\x80"
+    loaded = AddressBook().read_contacts_from_file(fn)
+    assert rows(loaded) == rows(book)
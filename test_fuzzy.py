@@ -0,0 +1,56 @@
+import random
+
+from chatbot.classes import AddressBook, Record
+from chatbot.indexes import BKTree, edit_distance
+
+# =============================================
+#     схожі імена: BK-дерево
+# =============================================
+# python -m pytest test_fuzzy.py
+
+
+def make_book():
+    book = AddressBook()
+    for name in ["Jonathan", "John", "Joan", "Anna", "Олена", "Bob"]:
+        book.add_record(Record(name))
+    return book
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+    assert edit_distance("olena", "olena") == 0
+    assert edit_distance("jon", "john") == 1
+
+
+def test_tree_matches_scan():
+    rnd = random.Random(5)
+    words = {"".join(rnd.choices("abcde", k=rnd.randint(1, 7))) for _ in range(500)}
+    tree = BKTree()
+    for word in words:
+        tree.add(word)
+    for word in ["abc", "eeee", "a", "bcdabcd"]:
+        expected = sorted(
+            (edit_distance(word, w), w) for w in words if edit_distance(word, w) <= 2
+        )
+        assert sorted(tree.search(word, 2)) == expected
+
+
+def test_closest_names():
+    book = make_book()
+    found = [(d, record.name.value) for d, record in book.fuzzy("johm")]
+    assert found == [(1, "John"), (2, "Joan")]
+    # інша абетка - через транслітерацію
+    assert book.fuzzy("olna")[0][1].name.value == "Олена"
+    assert "Joan, John" in book.did_you_mean("jhon")
+    assert book.did_you_mean("qwertyuiop") == ""
+
+
+def test_index_follows_changes():
+    book = make_book()
+    book.fuzzy("bob")
+    book.delete_record("Bob")
+    book.add_record(Record("Rob"))
+    assert [record.name.value for _, record in book.fuzzy("bob")] == ["Rob"]
+    assert "not found" in book.find_name("bob")
+    assert "did you mean: Rob?" in book.find_name("bob")
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import time
+
+from chatbot.classes import AddressBook, Record
+from chatbot.journal import file_lock
+
+# =============================================
+#     журнал змін AddressBook
+# =============================================
+# python -m pytest test_journal.py
+
+
+def open_book(fn):
+    # як main(): знімок і журнал читаються під одним блокуванням
+    journal_fn = fn + ".journal"
+    with file_lock(journal_fn):
+        return AddressBook().read_contacts_from_file(fn).attach_journal(journal_fn)
+
+
+def contents(book):
+    return [book.data[name].to_row() for name in book.data]
+
+
+def test_changes_replayed_from_journal(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    AddressBook().write_contacts_to_file(fn)
+    book = open_book(fn)
+    book.add_record(Record("Tom", "0671234567"))
+    book.data["Tom"].add_email("tom@mail.ukr.net")
+    book.add_record(Record("Ann"))
+    book.delete_record("Ann")
+    # save лише дописує журнал, знімок не переписується
+    assert book.save(fn) is None
+    assert not len(AddressBook().read_contacts_from_file(fn).data)
+
+    loaded = open_book(fn)
+    assert contents(loaded) == contents(book)
+    assert loaded.journal.count == 4
+    assert not loaded.dirty
+
+
+# ---------- кілька процесів з одним журналом ----------
+def test_concurrent_journal_merge(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    book = AddressBook()
+    book.add_record(Record("Tom", "0671234567"))
+    book.add_record(Record("Bob", "0501234567"))
+    book.write_contacts_to_file(fn)
+
+    first = open_book(fn)
+    second = open_book(fn)
+    first.add_record(Record("Ann", "0501111111"))
+    first.data["Tom"].add_phone("0672222222")
+    first.save(fn)
+
+    # second ще не бачив змін first: чужий хвіст журналу застосовується
+    # без повторного читання знімка, наші зміни - після нього
+    def no_reload(fn):
+        raise AssertionError("snapshot was re-read")
+
+    second._load_snapshot = no_reload
+    second.add_record(Record("Ann", "0503333333"))
+    second.data["Bob"].add_phone("0504444444")
+    second.save(fn)
+    first.refresh(fn)
+
+    assert contents(first) == contents(second)
+    assert second.data["Ann"].phones[0].value == "+380503333333"
+    assert len(second.data["Tom"].phones) == 2
+    # новий процес бачить те саме: знімок + журнал
+    assert contents(open_book(fn)) == contents(second)
+
+
+def test_compact_by_other_process(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    AddressBook().write_contacts_to_file(fn)
+    first = open_book(fn)
+    second = open_book(fn)
+    first.add_record(Record("Tom"))
+    first.compact(fn)  # новий знімок, журнал очищено
+
+    second.add_record(Record("Ann"))
+    second.save(fn)
+    first.refresh(fn)
+    assert list(first.data) == list(second.data) == ["Ann", "Tom"]
+    assert list(open_book(fn).data) == ["Ann", "Tom"]
+
+
+def test_lock_waits_for_other_process(tmp_path):
+    fn = str(tmp_path / "addressbook.bin.journal")
+    code = (
+        "import sys, time; from chatbot.journal import file_lock\n"
+        "with file_lock(sys.argv[1]): print(time.monotonic())"
+    )
+    with file_lock(fn):
+        child = subprocess.Popen(
+            [sys.executable, "-c", code, fn],
+            stdout=subprocess.PIPE,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        time.sleep(0.5)
+        released = time.monotonic()
+    # інший процес отримав блокування лише після нас
+    assert float(child.communicate(timeout=10)[0]) >= released
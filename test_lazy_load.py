@@ -0,0 +1,75 @@
+from chatbot.classes import AddressBook, Record
+from chatbot.notes import LazyNotesBook, NotesBook
+from chatbot.storage import LazyRecordStore
+
+# =============================================
+#     ліниве читання контактів і нотаток
+# =============================================
+# python -m pytest test_lazy_load.py
+
+
+def make_book(names):
+    book = AddressBook()
+    for i, name in enumerate(names):
+        record = Record(name, f"067{i:07d}", birthday=f"{i % 28 + 1:02d}-03-1990")
+        record.add_email(f"user{i}@mail.ukr.net")
+        book.add_record(record)
+    return book
+
+
+def rows(book):
+    return [book.data[name].to_row() for name in book.data]
+
+
+def test_book_file_round_trip(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    book = make_book(["Tom", "Ann", "Bob"])
+    book.write_contacts_to_file(fn)
+    loaded = AddressBook().read_contacts_from_file(fn)
+    assert isinstance(loaded.data, LazyRecordStore)
+    assert rows(loaded) == rows(book)
+
+
+def test_records_decoded_on_access(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    make_book(["Tom", "Ann", "Bob"]).write_contacts_to_file(fn)
+    book = AddressBook().read_contacts_from_file(fn)
+    # імена відомі з індексу файлу, записи ще не розібрані
+    assert list(book.data) == ["Ann", "Bob", "Tom"]
+    assert not book.data.cache
+    assert book.data["Bob"].phones[0].value == "+380670000002"
+    assert list(book.data.cache) == ["Bob"]
+
+
+def test_unchanged_records_copied_as_is(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    make_book(["Tom", "Ann", "Bob"]).write_contacts_to_file(fn)
+    book = AddressBook().read_contacts_from_file(fn)
+    ann = book.data.raw("Ann")
+    book.data["Tom"].add_phone("0501234567")
+    book.write_contacts_to_file(fn)
+    # збереження не розбирало незмінені записи
+    assert list(book.data.cache) == ["Tom"]
+    assert book.data.raw("Ann") == ann
+
+    loaded = AddressBook().read_contacts_from_file(fn)
+    assert len(loaded.data["Tom"].phones) == 2
+    assert rows(loaded) == rows(book)
+
+
+def test_notes_read_on_first_use(tmp_path):
+    fn = str(tmp_path / "notes.bin")
+    notes = NotesBook()
+    notes.add_note("plan", "buy milk", ["home"])
+    notes.write_notes_to_file(fn)
+
+    lazy = LazyNotesBook(fn)
+    # сесія без команд нотаток файл не читає і нічого не зберігає
+    assert lazy.book is None and not lazy.dirty
+    assert lazy.save(fn) is None
+    assert "plan" in lazy
+    assert lazy.book is not None
+    lazy.add_note("ідея", "", [])
+    assert lazy.dirty
+    lazy.save(fn)
+    assert list(NotesBook().read_notes_from_file(fn).data) == ["plan", "ідея"]
@@ -0,0 +1,66 @@
+import pytest
+
+import chatbot.main as main
+from chatbot.classes import AddressBook, Record
+
+# =============================================
+#     пошук контакту за ім'ям
+# =============================================
+# python -m pytest test_names.py
+
+
+@pytest.fixture
+def book(monkeypatch):
+    book = AddressBook()
+    for name in ["Tom Smith", "Ann", "Олена"]:
+        book.add_record(Record(name))
+    monkeypatch.setattr(main, "book", book)
+    return book
+
+
+def test_case_and_spaces_ignored(book):
+    assert book.find_key("tom smith") == "Tom Smith"
+    assert book.find_key("  TOM   smith ") == "Tom Smith"
+    assert book.find_key("олена") == "Олена"
+    assert book.find_key("Tom") is None
+    assert book.find_record("ANN") is book.data["Ann"]
+
+
+def test_index_follows_changes(book):
+    assert book.find_key("ann") == "Ann"
+    book.delete_record("ANN")
+    assert book.find_key("ann") is None
+    book.change_name("tom  smith", "TOM SMITH JR")
+    assert list(book.data) == ["Tom Smith Jr", "Олена"]
+    assert book.find_key("tom smith jr") == "Tom Smith Jr"
+    assert book.find_key("tom smith") is None
+
+
+def test_commands_use_index(book):
+    assert "already exist" in main.add_contact("ann")
+    assert "0501234567" in main.add_phones("tom smith", "0501234567")
+    assert "successfully deleted" in main.delete_record("олена")
+    assert list(book.data) == ["Ann", "Tom Smith"]
+
+
+
+# ---------- інша абетка і схоже звучання ----------
+def test_other_alphabet_only_for_lookup(book):
+    assert "Олена" in book.find_name("olena")
+    assert book.find_key("olena") is None
+    # команди, що змінюють дані, працюють лише з точним ім'ям
+    assert "not found" in book.delete_record("olena")
+    assert "Олена" in book.data
+    main.add_contact("Ivan")
+    assert "successfully added" in main.add_contact("Іван")
+    assert list(book.data) == ["Ann", "Ivan", "Tom Smith", "Іван", "Олена"]
+    # точне ім'я важливіше за транслітерацію
+    assert "Ivan" in book.find_name("ivan") and "Іван" in book.find_name("іван")
+
+
+def test_sounds_like(book):
+    for name in ["Oleksandr", "Олександр", "Alexander"]:
+        book.add_record(Record(name))
+    found = [record.name.value for record in book.sounds_like("олександр")]
+    assert found == ["Oleksandr", "Олександр", "Alexander"]
+    assert not book.sounds_like("Bob")
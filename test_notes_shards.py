@@ -0,0 +1,76 @@
+from chatbot.notes import NotesBook
+
+# =============================================
+#     нотатки у шардах з індексом заголовків
+# =============================================
+# python -m pytest test_notes_shards.py
+
+
+def contents(notes):
+    return [notes.data[title].to_row() for title in notes.data]
+
+
+def test_shards_round_trip(tmp_path):
+    notes = NotesBook.open_sharded(tmp_path / "notes")
+    for i in range(20):
+        notes.add_note(f"note {i}", f"text {i}", [f"tag{i % 3}"])
+    notes.delete_note("note 7")
+    notes.write_notes_to_file(None)
+
+    loaded = NotesBook.open_sharded(tmp_path / "notes")
+    # заголовки і теги - з індексу, шарди ще не читалися
+    assert len(loaded.data) == 19 and not loaded.data.loaded
+    assert loaded.data.tags["note 5"] == ["tag2"]
+    assert contents(loaded) == contents(notes)
+
+
+def test_content_edit_keeps_index(tmp_path):
+    notes = NotesBook.open_sharded(tmp_path / "notes")
+    notes.add_note("plan", "buy milk", ["home"])
+    notes.add_note("idea", "", [])
+    notes.write_notes_to_file(None)
+    generation = notes.data.generation
+
+    notes.edit_note("plan", "buy bread")
+    assert not notes.data.index_dirty
+    notes.write_notes_to_file(None)
+    assert notes.data.generation == generation
+    notes.add_tags("plan", ["shop"])
+    notes.write_notes_to_file(None)
+    assert notes.data.generation == generation + 1
+
+    loaded = NotesBook.open_sharded(tmp_path / "notes")
+    assert str(loaded.data["plan"].content) == "buy bread"
+    assert loaded.data.tags["plan"] == ["home", "shop"]
+
+
+def test_two_copies_keep_both_changes(tmp_path):
+    first = NotesBook.open_sharded(tmp_path / "notes")
+    first.add_note("old", "text", [])
+    first.add_note("gone", "", [])
+    first.write_notes_to_file(None)
+
+    second = NotesBook.open_sharded(tmp_path / "notes")
+    first.add_note("first", "", ["a"])
+    first.edit_note("old", "edited")
+    first.write_notes_to_file(None)
+    second.add_note("second", "", ["b"])
+    second.delete_note("gone")
+    second.write_notes_to_file(None)
+
+    expected = ["first", "old", "second"]
+    assert list(second.data) == expected
+    assert str(second.data["old"].content) == "edited"
+    # refresh підтягує зміни іншої копії
+    first.refresh(None)
+    assert list(first.data) == expected
+    assert list(NotesBook.open_sharded(tmp_path / "notes").data) == expected
+
+
+def test_legacy_notes_moved(tmp_path):
+    fn = str(tmp_path / "notes.bin")
+    old = NotesBook()
+    old.add_note("plan", "buy milk", ["home"])
+    old.write_notes_to_file(fn)
+    notes = NotesBook.open_sharded(tmp_path / "notes", fn)
+    assert contents(notes) == contents(old)
@@ -0,0 +1,58 @@
+from chatbot.classes import AddressBook, Record
+from chatbot.notes import NotesBook
+from chatbot.storage import SortedDict
+
+# =============================================
+#     сховища тримають ключі відсортованими
+# =============================================
+# python -m pytest test_order.py
+
+
+def make_book(names):
+    book = AddressBook()
+    for i, name in enumerate(names):
+        record = Record(name, f"067{i:07d}", birthday=f"{i % 28 + 1:02d}-03-1990")
+        record.add_email(f"user{i}@mail.ukr.net")
+        record.add_address(f"Kyiv, {name} street {i}")
+        book.add_record(record)
+    return book
+
+
+def test_sorted_dict_order():
+    data = SortedDict({"tom": 1, "ann": 2})
+    data["bob"] = 3
+    data.update({"zed": 4, "abe": 5, "ann": 6})
+    del data["tom"]
+    assert list(data) == ["abe", "ann", "bob", "zed"]
+    assert data["ann"] == 6
+    assert list(data.irange("b", "z")) == ["bob"]
+
+
+def test_lazy_store_order(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    make_book(["Tom", "Ann", "Mike"]).write_contacts_to_file(fn)
+    book = AddressBook().read_contacts_from_file(fn)
+    book.add_record(Record("Bob"))
+    book.add_records([Record("Zed"), Record("Abe")])
+    book.delete_record("Mike")
+    expected = ["Abe", "Ann", "Bob", "Tom", "Zed"]
+    assert list(book.data) == expected
+    assert list(book.data.irange("B", "U")) == ["Bob", "Tom"]
+
+    # після збереження змінені записи читаються вже з файлу
+    book.write_contacts_to_file(fn)
+    assert not book.data.changed
+    assert list(book.data) == expected
+    assert list(AddressBook().read_contacts_from_file(fn).data) == expected
+
+
+def test_notes_order(tmp_path):
+    fn = str(tmp_path / "notes.bin")
+    notes = NotesBook()
+    for title in ["zoo", "apple", "Mango"]:
+        notes.add_note(title, "", [])
+    assert list(notes.data) == ["Mango", "apple", "zoo"]
+    notes.write_notes_to_file(fn)
+    loaded = NotesBook().read_notes_from_file(fn)
+    loaded.add_note("banana", "", [])
+    assert list(loaded.data) == ["Mango", "apple", "banana", "zoo"]
@@ -0,0 +1,61 @@
+import pytest
+
+import chatbot.main as main
+from chatbot.classes import AddressBook, Record
+from chatbot.paging import decode_cursor, encode_cursor
+
+# =============================================
+#     посторінковий перегляд за курсором
+# =============================================
+# python -m pytest test_paging.py
+
+
+def make_book(names):
+    book = AddressBook()
+    book.add_records([Record(name) for name in names])
+    return book
+
+
+def names(records):
+    return [record.name.value for record in records]
+
+
+def test_pages_in_key_order():
+    book = make_book(["Tom", "Ann", "Bob", "Eve", "Zed"])
+    records, cursor = book.page(None, 2)
+    assert names(records) == ["Ann", "Bob"]
+    records, cursor = book.page(cursor, 2)
+    assert names(records) == ["Eve", "Tom"]
+    records, cursor = book.page(cursor, 2)
+    assert names(records) == ["Zed"] and cursor is None
+    assert [names(page) for page in book.pages(5)] == [
+        ["Ann", "Bob", "Eve", "Tom", "Zed"]
+    ]
+    assert names(book.page()[0]) == ["Ann", "Bob", "Eve", "Tom", "Zed"]
+
+
+def test_cursor_survives_changes():
+    book = make_book(["Ann", "Bob", "Eve", "Tom"])
+    records, cursor = book.page(None, 2)
+    list(records)
+    # курсор - останній показаний ключ, а не номер позиції
+    book.delete_record("Bob")
+    book.add_record(Record("Abe"))
+    book.add_record(Record("Dan"))
+    assert names(book.page(cursor, 2)[0]) == ["Dan", "Eve"]
+    assert decode_cursor(encode_cursor("Олена")) == "Олена"
+
+
+def test_between():
+    book = make_book(["Billy", "Ann", "Dora", "Dan", "Ed"])
+    assert names(book.between("b", "d")) == ["Billy", "Dan", "Dora"]
+
+
+def test_bad_page_size(monkeypatch):
+    book = make_book(["Ann", "Bob"])
+    with pytest.raises(ValueError):
+        book.page(None, -1)
+    monkeypatch.setattr(main, "book", book)
+    for size in ["-1", "0", "two"]:
+        assert "must be a positive number" in main.show_all(size)
+    assert main.show_all("5").endswith("End of List ---")
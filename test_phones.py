@@ -0,0 +1,45 @@
+import chatbot.main as main
+from chatbot.classes import AddressBook, Record
+
+# =============================================
+#     хто дзвонить: пошук контакту за номером
+# =============================================
+# python -m pytest test_phones.py
+
+
+def names(records):
+    return [record.name.value for record in records]
+
+
+def make_book():
+    book = AddressBook()
+    book.add_record(Record("Tom", "0671234567"))
+    book.add_record(Record("Ann", "+380671234567"))
+    book.add_record(Record("Bob", "0501234567"))
+    return book
+
+
+def test_any_phone_format():
+    book = make_book()
+    for phone in ["0671234567", "+380671234567", "380671234567", "(067) 123-45-67"]:
+        assert names(book.find_by_phone(phone)) == ["Ann", "Tom"]
+    assert not book.find_by_phone("0931234567")
+
+
+def test_index_follows_changes():
+    book = make_book()
+    assert names(book.find_by_phone("0501234567")) == ["Bob"]
+    book.data["Bob"].edit_phone("0501234567", "0931234567")
+    book.data["Tom"].remove_phone("0671234567")
+    book.data["Tom"].add_phone("0501234567")
+    book.delete_record("Ann")
+    assert names(book.find_by_phone("0501234567")) == ["Tom"]
+    assert names(book.find_by_phone("0931234567")) == ["Bob"]
+    assert not book.find_by_phone("0671234567")
+
+
+def test_who_command(monkeypatch):
+    monkeypatch.setattr(main, "book", make_book())
+    assert "Bob" in main.who("050-123-45-67")
+    assert "not found" in main.who("0931234567")
+    assert "format" in main.who("12")
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+import pytest
+
+from chatbot.classes import AddressBook, Record
+from chatbot.query import Query, QueryError
+
+# =============================================
+#     команда query: умови і план за індексами
+# =============================================
+# python -m pytest test_query.py
+
+
+@pytest.fixture
+def book():
+    soon = (date.today() + timedelta(days=3)).strftime("%d-%m-1990")
+    book = AddressBook()
+    for name, phone, email, birthday, address in [
+        ("Jonathan", "0671234567", "jon@gmail.com", soon, "Kyiv, Main 1"),
+        ("John", "0679999999", "john@mail.ukr.net", "25-12-1985", "Lviv"),
+        ("Олександр", "0501234567", "sasha@gmail.com", soon, "Kyiv, Park 2"),
+        ("Ann", None, None, None, None),
+    ]:
+        book.add_record(Record(name, phone, birthday, email, address))
+    return book
+
+
+def run(book, text):
+    return [record.name.value for record in Query(text).run(book)]
+
+
+def test_conditions(book):
+    assert run(book, "phone:067*") == ["John", "Jonathan"]
+    assert run(book, "phone:0671234567") == ["Jonathan"]
+    assert run(book, "tel:1234567") == ["Jonathan", "Олександр"]
+    assert run(book, "email:@gmail.com") == ["Jonathan", "Олександр"]
+    assert run(book, "email:jo*") == ["John", "Jonathan"]
+    assert run(book, "addr:kyiv bd:<7d") == ["Jonathan", "Олександр"]
+    assert run(book, "bd:25-12") == ["John"]
+    assert run(book, "name:~alexander") == ["Олександр"]
+    assert run(book, "name:jo phone:067* email:gmail") == ["Jonathan"]
+    assert run(book, "lviv") == ["John"]
+    assert run(book, "name:nobody") == []
+
+
+def test_plan_uses_smallest_index(book):
+    query = Query("addr:kyiv phone:0679999999")
+    assert [r.name.value for r in query.run(book)] == []
+    assert query.explain == "phone index, 1 candidates"
+    query = Query("email:@ukr.net")
+    list(query.run(book))
+    assert query.explain == "email index, 1 candidates"
+    query = Query("addr:ky")
+    list(query.run(book))
+    assert query.explain == "full scan, 4 records"
+
+
+def test_errors():
+    for text in ["", "phone:", "color:red", "phone:abc", "bd:31-02"]:
+        with pytest.raises(QueryError):
+            Query(text)
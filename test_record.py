@@ -0,0 +1,61 @@
+import pickle
+from datetime import date
+
+import chatbot.classes as classes
+
+# =============================================
+#     Record і поля: слоти та кеш рядка
+# =============================================
+# python -m pytest test_record.py
+
+
+def make_record():
+    record = classes.Record("Tom", "0671234567", birthday="18-11-1986")
+    record.add_email("tom@gmail.com")
+    record.add_address("Kyiv")
+    return record
+
+
+def test_no_instance_dict():
+    record = make_record()
+    fields = [record.name, record.phones[0], record.emails[0], record.address]
+    for obj in [record, record.birthday, *fields]:
+        assert not hasattr(obj, "__dict__")
+
+
+def test_pickle_keeps_fields():
+    record = make_record()
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy.to_row() == record.to_row()
+    assert copy.book is None and copy.version == 0
+
+
+# ---------- кеш дня народження і рядка запису ----------
+class Today(date):
+    day = date(2025, 11, 10)
+
+    @classmethod
+    def today(cls):
+        return cls.day
+
+
+def test_str_cached_until_change(monkeypatch):
+    monkeypatch.setattr(classes, "date", Today)
+    record = make_record()
+    line = str(record)
+    assert "8 days until the 39th birthday" in line
+    assert str(record) is line
+    record.add_phone("0501234567")
+    assert "+380501234567" in str(record) and str(record) is not line
+    record.add_birthday("12-11-1990")
+    assert "2 days until the 35th birthday" in str(record)
+    assert record.birthday_info() == (date(2025, 11, 12), 2, 35)
+
+
+def test_str_follows_date(monkeypatch):
+    monkeypatch.setattr(classes, "date", Today)
+    record = make_record()
+    assert "8 days until" in str(record)
+    monkeypatch.setattr(Today, "day", date(2025, 11, 18))
+    assert "today is 39th birthday" in str(record)
+    assert record.birthday_info(date(2025, 11, 19)) == (date(2026, 11, 18), 364, 40)
@@ -0,0 +1,54 @@
+import pytest
+
+import chatbot.main as main
+from chatbot.cache import ResultCache
+from chatbot.classes import AddressBook, Record
+
+# =============================================
+#     кеш результатів команд пошуку
+# =============================================
+# python -m pytest test_result_cache.py
+
+
+@pytest.fixture
+def book(monkeypatch):
+    book = AddressBook()
+    book.add_record(Record("Tom", "0671234567"))
+    monkeypatch.setattr(main, "book", book)
+    monkeypatch.setattr(main, "results", ResultCache(8))
+    return book
+
+
+def test_lru_order():
+    cache = ResultCache(2)
+    assert cache.get("a", lambda: 1) == 1
+    assert cache.get("b", lambda: 2) == 2
+    assert cache.get("a", lambda: 0) == 1
+    cache.get("c", lambda: 3)
+    # витіснено "b" - до нього зверталися найдавніше
+    assert cache.get("b", lambda: 4) == 4
+    assert len(cache) == 2 and (cache.hits, cache.misses) == (1, 4)
+
+
+def test_repeated_search_is_cached(book):
+    first = main.search("tom")
+    assert main.search(" TOM ") == first
+    assert (main.results.hits, main.results.misses) == (1, 1)
+
+
+def test_changes_invalidate(book):
+    assert "Tom" in main.who("0671234567")
+    book.data["Tom"].remove_phone("0671234567")
+    assert "not found" in main.who("0671234567")
+    book.add_record(Record("Ann", "0671234567"))
+    assert "Ann" in main.who("0671234567")
+    assert "Ann" in main.search("ann")
+    book.delete_record("Ann")
+    assert "nothing was found" in main.search("ann")
+    assert main.results.hits == 0
+
+
+def test_other_book_not_shared(book, monkeypatch):
+    assert "Tom" in main.search("tom")
+    monkeypatch.setattr(main, "book", AddressBook())
+    assert "nothing was found" in main.search("tom")
@@ -0,0 +1,60 @@
+import pytest
+
+import chatbot.main as main
+from chatbot.classes import AddressBook, Record
+from chatbot.indexes import search_texts
+
+# =============================================
+#     команда search: триграмний індекс
+# =============================================
+# python -m pytest test_search.py
+
+
+@pytest.fixture
+def book(monkeypatch):
+    book = AddressBook()
+    for i, name in enumerate(["Tom", "Ann", "Олена", "Tomas", "Bob"]):
+        record = Record(name, f"067{i:07d}", birthday=f"{i + 1:02d}-03-199{i}")
+        record.add_email(f"user{i}@mail.ukr.net")
+        record.add_address(f"Kyiv, street {i}")
+        book.add_record(record)
+    monkeypatch.setattr(main, "book", book)
+    return book
+
+
+def scan(book, text):
+    # перевірка без індексу
+    names = []
+    for name in book.data:
+        if any(text in field for field in search_texts(book.data[name])):
+            names.append(name)
+    return names
+
+
+def found(book, text):
+    records = book.search(text)
+    return [r.name.value for r in records if text in "\n".join(search_texts(r))]
+
+
+def test_same_as_scan(book):
+    for text in ["tom", "оле", "mail.ukr", "0000003", "03-199", "street 4", "xyz"]:
+        assert found(book, text) == scan(book, text)
+    # лише записи з усіма триграмами, а не всі
+    assert len(list(book.search("tom"))) == 2
+    # короткий запит - перебір усіх записів
+    assert len(list(book.search("to"))) == 5
+
+
+def test_index_follows_changes(book):
+    assert found(book, "street 1") == ["Ann"]
+    book.data["Ann"].add_address("Lviv, square 5")
+    book.add_record(Record("Tomek"))
+    book.delete_record("Tomas")
+    assert found(book, "street 1") == []
+    assert found(book, "square") == ["Ann"]
+    assert found(book, "tom") == ["Tom", "Tomek"]
+
+
+def test_search_command(book):
+    assert "Олена" in main.search("ОЛЕ")
+    assert "nothing was found" in main.search("xyz")
@@ -0,0 +1,59 @@
+import os
+
+from chatbot.classes import AddressBook, Record
+from chatbot.snapshot import read_snapshot, write_snapshot
+
+# =============================================
+#     атомарні знімки з попередніми копіями
+# =============================================
+# python -m pytest test_snapshot.py
+
+
+def test_rotation_keeps_previous_versions(tmp_path):
+    fn = str(tmp_path / "data.bin")
+    for generation, payload in enumerate([b"one", b"two", b"three", b"four"]):
+        write_snapshot(fn, payload, generation, 3)
+    assert read_snapshot(fn, 3)[:2] == (b"four", 3)
+    assert read_snapshot(fn + ".1", 1)[0] == b"three"
+    assert read_snapshot(fn + ".2", 1)[0] == b"two"
+    assert not os.path.exists(fn + ".3")
+    assert not os.path.exists(fn + ".tmp")
+
+
+def test_same_data_does_not_rotate(tmp_path):
+    fn = str(tmp_path / "data.bin")
+    write_snapshot(fn, b"one", 1, 3)
+    write_snapshot(fn, b"two", 2, 3)
+    # ті самі дані (лише нове покоління) не витісняють попередню копію
+    write_snapshot(fn, b"two", 3, 3)
+    assert read_snapshot(fn, 3)[:2] == (b"two", 3)
+    assert read_snapshot(fn + ".1", 1)[0] == b"one"
+    assert not os.path.exists(fn + ".2")
+
+
+def test_torn_snapshot_falls_back_to_backup(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    book = AddressBook()
+    book.add_record(Record("Tom", "0671234567"))
+    book.write_contacts_to_file(fn)
+    book.add_record(Record("Ann", "0501234567"))
+    book.write_contacts_to_file(fn)
+    assert os.path.exists(fn + ".1")
+
+    # збій посеред запису: файл коротший, ніж записано в заголовку
+    with open(fn, "r+b") as fh:
+        fh.truncate(os.path.getsize(fn) - 3)
+    loaded = AddressBook().read_contacts_from_file(fn)
+    assert list(loaded.data) == ["Tom"]
+    assert loaded.snapshot_generation == 1
+
+
+def test_damaged_snapshot_without_backup(tmp_path):
+    fn = str(tmp_path / "addressbook.bin")
+    book = AddressBook()
+    book.add_record(Record("Tom"))
+    book.write_contacts_to_file(fn)
+    with open(fn, "r+b") as fh:
+        fh.truncate(10)
+    loaded = AddressBook().read_contacts_from_file(fn)
+    assert not len(loaded.data)
@@ -0,0 +1,67 @@
+from chatbot.classes import AddressBook, Record
+
+# =============================================
+#     AddressBook у файлі SQLite
+# =============================================
+# python -m pytest test_sqlite.py
+
+
+def fill(book):
+    tom = Record("Tom", "0671234567", birthday="18-11-1986")
+    tom.add_email("tom@gmail.com")
+    tom.add_address("Kyiv, Khreshchatyk 1")
+    ann = Record("Ann", "0501234567")
+    ann.add_email("ann@mail.ukr.net")
+    book.add_records([tom, ann, Record("Олена", "0671234567")])
+    book.add_record(Record("Bob"))
+    book.data["Ann"].add_phone("0931234567")
+    book.delete_record("Bob")
+    return book
+
+
+def rows(book):
+    return [book.data[name].to_row() for name in book.data]
+
+
+def test_records_persist(tmp_path):
+    fn = str(tmp_path / "addressbook.db")
+    book = fill(AddressBook.open_sqlite(fn))
+    book.write_contacts_to_file(fn)
+    book.data.close()
+
+    loaded = AddressBook.open_sqlite(fn)
+    assert list(loaded.data) == ["Ann", "Tom", "Олена"]
+    assert rows(loaded) == rows(fill(AddressBook()))
+    loaded.data.close()
+
+
+def test_queries_match_memory(tmp_path):
+    memory = fill(AddressBook())
+    book = fill(AddressBook.open_sqlite(str(tmp_path / "addressbook.db")))
+    for check in [
+        lambda b: [r.name.value for r in b.find_by_phone("0671234567")],
+        lambda b: b.names_by_email_domain("ukr.net"),
+        lambda b: b.names_by_email_domain("@gmail.com"),
+        lambda b: b.names_by_email_prefix("TOM"),
+        lambda b: sorted(b.names_by_text("khreshch") or []),
+        lambda b: list(b.data.irange("B", "U")),
+    ]:
+        assert check(book) == check(memory)
+    assert book.names_by_text("khreshch") == {"Tom"}
+    book.data.close()
+
+
+def test_legacy_file_moved_once(tmp_path):
+    legacy_fn = str(tmp_path / "addressbook.bin")
+    fill(AddressBook()).write_contacts_to_file(legacy_fn)
+    fn = str(tmp_path / "addressbook.db")
+    book = AddressBook.open_sqlite(fn, legacy_fn)
+    assert rows(book) == rows(fill(AddressBook()))
+    book.delete_record("Ann")
+    book.write_contacts_to_file(fn)
+    book.data.close()
+
+    # непорожня база вже не читає старий файл
+    book = AddressBook.open_sqlite(fn, legacy_fn)
+    assert list(book.data) == ["Tom", "Олена"]
+    book.data.close()
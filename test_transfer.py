@@ -0,0 +1,68 @@
+from chatbot.classes import AddressBook, Record
+from chatbot.constants import IMPORT_ERRORS_SHOWN
+from chatbot.transfer import export_contacts, import_contacts
+
+# =============================================
+#     import / export контактів (CSV, vCard)
+# =============================================
+# python -m pytest test_transfer.py
+
+
+def make_book():
+    book = AddressBook()
+    tom = Record("Tom", "0671234567", birthday="18-11-1986")
+    tom.add_phone("0501234567")
+    tom.add_email("tom@gmail.com")
+    tom.add_address("Kyiv, Khreshchatyk 1; flat 2")
+    book.add_record(tom)
+    book.add_record(Record("Олена", email="olena@mail.ukr.net"))
+    book.add_record(Record("Empty"))
+    return book
+
+
+def rows(book):
+    return [book.data[name].to_row() for name in book.data]
+
+
+def test_csv_round_trip(tmp_path):
+    path = tmp_path / "Contacts.CSV"
+    book = make_book()
+    assert export_contacts(book, str(path)).startswith("3 contacts")
+    imported = AddressBook()
+    result = import_contacts(imported, str(path))
+    # шлях показується так, як його ввели
+    assert result == f"3 contacts have been imported from {path}"
+    assert rows(imported) == rows(book)
+
+
+def test_vcard_round_trip(tmp_path):
+    path = str(tmp_path / "contacts.vcf")
+    book = make_book()
+    export_contacts(book, path)
+    imported = AddressBook()
+    import_contacts(imported, path)
+    assert rows(imported) == rows(book)
+    # повторний імпорт не дублює контакти
+    assert import_contacts(imported, path).startswith("0 contacts")
+    assert len(imported.data) == 3
+
+
+def test_bad_rows_reported(tmp_path):
+    path = tmp_path / "contacts.csv"
+    lines = ["name,phones,emails,birthday,address", "Ann,0501234567; 123,,,"]
+    lines += [f"Bad{i},,not-an-email,31-02-1990," for i in range(20)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    book = AddressBook()
+    result = import_contacts(book, str(path))
+    assert result.startswith("21 contacts")
+    assert [p.value for p in book.data["Ann"].phones] == ["+380501234567"]
+    assert book.data["Bad0"].birthday is None and not book.data["Bad0"].emails
+    # рахуються всі помилки, показуються лише перші
+    assert "41 problems" in result
+    assert result.count("\n\t") == IMPORT_ERRORS_SHOWN + 1
+    assert f"... and {41 - IMPORT_ERRORS_SHOWN} more" in result
+
+
+def test_missing_file(tmp_path):
+    result = import_contacts(AddressBook(), str(tmp_path / "nothing.csv"))
+    assert "does not exist" in result
@@ -0,0 +1,77 @@
+import pytest
+
+from chatbot.classes import Email, EmailError, Phone, PhoneError, Record
+from chatbot.validators import extract_emails, normalize_email, normalize_phone
+
+# =============================================
+#     пакетна перевірка номерів і e-mail
+# =============================================
+# python -m pytest test_validators.py
+
+
+def test_normalize_many_phones():
+    phones = ["067 123 45 67", "+38(050)123-45-67", "12", "", "0931234567", "abc"]
+    valid, errors = Phone.normalize_many(phones)
+    assert valid == ["+380671234567", "+380501234567", "+380931234567"]
+    assert [phone for phone, _ in errors] == ["12", "", "abc"]
+    assert all(isinstance(error, PhoneError) for _, error in errors)
+    # те саме, що й поштучна перевірка
+    assert valid == [normalize_phone(p) for p in phones if normalize_phone(p)]
+
+
+def test_phone_with_newline_checked_alone():
+    valid, errors = Phone.normalize_many(["067\n1234567", "0671234567"])
+    assert valid == ["+380671234567"]
+    assert [phone for phone, _ in errors] == ["067\n1234567"]
+    assert Phone.normalize_many([]) == ([], [])
+
+
+# ---------- e-mail ----------
+def test_email_rules():
+    for email in [
+        "tom@gmail.com",
+        "first.last+tag@mail.ukr.net",
+        "olena@xn--80aswg.xn--j1amh",
+        "a_b%c-d@sub-1.example.co.uk",
+    ]:
+        assert normalize_email(f"  {email} ") == email
+    for email in [
+        "tom@gmail",
+        "tom..x@gmail.com",
+        ".tom@gmail.com",
+        "tom@-gmail.com",
+        "tom@gmail.c",
+        "tom@gmail.xn--",
+        "олена@mail.ukr.net",
+        "x" * 250 + "@i.ua",
+    ]:
+        assert normalize_email(email) is None
+    with pytest.raises(EmailError):
+        Email("tom@gmail")
+
+
+def test_validate_many():
+    valid, errors = Email.validate_many([" tom@gmail.com", "bad", "ann@i.ua"])
+    assert valid == ["tom@gmail.com", "ann@i.ua"]
+    assert [email for email, _ in errors] == ["bad"]
+
+
+def test_extract_from_text():
+    text = "write tom@gmail.com or\n<ann@i.ua>, not x@y or mail@host.c0m"
+    assert Email.find_all_emails(text) == ["tom@gmail.com", "ann@i.ua"]
+    assert list(extract_emails(iter(["a@b.ua b@c.ua", "c@d.ua"]))) == [
+        "a@b.ua",
+        "b@c.ua",
+        "c@d.ua",
+    ]
+
+
+def test_legacy_address_can_be_removed():
+    # адреса, прийнята старими правилами, з файлу читається без перевірки
+    record = Record("Tom")
+    record.emails.append(Email.restore("tom@localhost"))
+    assert "found" in record.find_email("tom@localhost")
+    assert "successfully changed" in record.edit_email("tom@localhost", "tom@i.ua")
+    record.emails.append(Email.restore("old@host"))
+    assert "has been removed" in record.remove_email("old@host")
+    assert [email.value for email in record.emails] == ["tom@i.ua"]